@@ -0,0 +1,81 @@
+# Wszystkie funkcje redukujące w jednym przebiegu
+
+import argparse
+import sys
+from typing import Any, Callable, Iterable, Protocol
+
+from reduce.biggest import BiggestFinder, print_biggest
+from reduce.codes import CodeCounter, print_codes
+from reduce.data import SizeSum, print_sizes
+from reduce.downloads import ImageRatio, print_ratio
+from reduce.sketches import DistinctHostsPerDay, TopHosts, TopPaths, print_distinct, print_top
+
+
+class Aggregator(Protocol):
+    def update(self, tokens: list[str]) -> None: ...
+    def merge(self, other: Any) -> None: ...
+    def result(self) -> Any: ...
+
+
+# name -> (aggregator factory, printer)
+AGGREGATORS: dict[str, tuple[Callable[[], Aggregator], Callable[[Any], None]]] = {
+    "codes": (CodeCounter, print_codes),
+    "data": (SizeSum, print_sizes),
+    "biggest": (BiggestFinder, print_biggest),
+    "downloads": (ImageRatio, print_ratio),
+    # approximate, bounded memory
+    "top_paths": (TopPaths, print_top),
+    "top_hosts": (TopHosts, print_top),
+    "distinct_hosts": (DistinctHostsPerDay, print_distinct),
+}
+
+DEFAULT_STATS = ["codes", "data", "biggest", "downloads"]
+
+
+def make_aggregators(names: Iterable[str]) -> dict[str, Aggregator]:
+    return {name: AGGREGATORS[name][0]() for name in names}
+
+
+def feed(lines: Iterable[str], aggregators: dict[str, Aggregator]) -> dict[str, Aggregator]:
+    # every line is split once and the tokens are shared by all aggregators
+    updates = [aggregator.update for aggregator in aggregators.values()]
+
+    for line in lines:
+        tokens = line.split(" ")
+        for update in updates:
+            update(tokens)
+
+    return aggregators
+
+
+def aggregate(lines: Iterable[str], names: Iterable[str]) -> dict[str, Any]:
+    aggregators = feed(lines, make_aggregators(names))
+    return {name: aggregator.result() for name, aggregator in aggregators.items()}
+
+
+def print_results(results: dict[str, Any]) -> None:
+    for name, result in results.items():
+        print(f"[{name}]")
+        AGGREGATORS[name][1](result)
+
+
+parser = argparse.ArgumentParser(description="Statystyki logu w jednym przebiegu")
+parser.add_argument("stats", nargs="*", metavar="STAT",
+                    help=f"Statystyki do policzenia: {', '.join(AGGREGATORS)} (domyslnie: {', '.join(DEFAULT_STATS)})")
+
+
+def main() -> None:
+    args = parser.parse_args()
+    for name in args.stats:
+        if name not in AGGREGATORS:
+            parser.error(f"unknown stat: {name}")
+
+    try:
+        results = aggregate(sys.stdin, dict.fromkeys(args.stats or DEFAULT_STATS))
+        print_results(results)
+    except ValueError:
+        print("Malformed data")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Porownanie: cztery skrypty z 2/reduce po kolei vs. aggregate.py
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HOSTS = ["199.72.81.55", "unicomp6.unicomp.net", "burger.letters.com", "d104.aa.net", "kgtyk4.kj.yamagata-u.ac.jp", "host.pl"]
+PATHS = ["/history/apollo/", "/shuttle/countdown/", "/images/NASA-logosmall.gif", "/images/KSC-logosmall.gif",
+         "/shuttle/countdown/video/livevideo.jpeg", "/shuttle/missions/sts-73/mission-sts-73.html"]
+CODES = ["200", "200", "200", "200", "302", "304", "404"]
+
+
+def write_sample_log(path: str, n: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    with open(path, "w") as f:
+        for _ in range(n):
+            code = rnd.choice(CODES)
+            size = "-" if code == "404" else str(rnd.randint(0, 100000))
+            f.write(f'{rnd.choice(HOSTS)} - - [{rnd.randint(1, 28):02d}/Jul/1995:{rnd.randint(0, 23):02d}:'
+                    f'{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} -0400] '
+                    f'"GET {rnd.choice(PATHS)} HTTP/1.0" {code} {size}\n')
+
+
+def run(script: str, log_path: str, *args: str) -> float:
+    start = time.perf_counter()
+    with open(log_path) as f:
+        subprocess.run([sys.executable, os.path.join(HERE, script), *args], stdin=f, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark aggregate.py")
+    parser.add_argument("-n", "--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "access.log")
+        write_sample_log(log_path, args.lines)
+
+        separate = sum(run(script, log_path) for script in
+                       ["reduce/codes.py", "reduce/data.py", "reduce/biggest.py", "reduce/downloads.py"])
+        combined = run("aggregate.py", log_path)
+
+    print(f"linie: {args.lines}")
+    print(f"4 skrypty po kolei: {separate:.2f} s")
+    print(f"aggregate.py:       {combined:.2f} s")
+    print(f"przyspieszenie:     {separate / combined:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
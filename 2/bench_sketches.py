@@ -0,0 +1,81 @@
+# Porownanie: dokladne liczenie (dict/set) vs. szkice z reduce/sketches.py
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable
+
+from reduce.sketches import DistinctHostsPerDay, TopHosts
+
+
+def sample_lines(n: int, hosts: int, seed: int = 0) -> list[str]:
+    # zipf-like host popularity with a long tail of rare hosts
+    rnd = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(hosts)]
+    picked = rnd.choices(range(hosts), weights=weights, k=n)
+    return [f'h{h}.example.com - - [{i * 3 // n + 1:02d}/Jul/1995:00:00:01 -0400] "GET /x{h % 1000}.html HTTP/1.0" 200 1\n'
+            for i, h in enumerate(picked)]
+
+
+def measure(function: Callable[[], object]) -> tuple[object, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+def exact_top(lines: list[str]) -> Counter:
+    return Counter(line.split(" ", 1)[0] for line in lines)
+
+
+def exact_distinct(lines: list[str]) -> dict[str, set[str]]:
+    days: dict[str, set[str]] = {}
+    for line in lines:
+        tokens = line.split(" ")
+        days.setdefault(tokens[3][1:12], set()).add(tokens[0])
+    return days
+
+
+def sketch(lines: list[str]) -> tuple[TopHosts, DistinctHostsPerDay]:
+    top, distinct = TopHosts(), DistinctHostsPerDay()
+    for line in lines:
+        tokens = line.split(" ")
+        top.update(tokens)
+        distinct.update(tokens)
+    return top, distinct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reduce/sketches.py")
+    parser.add_argument("-n", "--lines", type=int, default=1_000_000)
+    parser.add_argument("--hosts", type=int, default=300_000)
+    args = parser.parse_args()
+
+    lines = sample_lines(args.lines, args.hosts)
+
+    counter, counter_time, counter_memory = measure(lambda: exact_top(lines))
+    days, days_time, days_memory = measure(lambda: exact_distinct(lines))
+    (top, distinct), sketch_time, sketch_memory = measure(lambda: sketch(lines))
+
+    exact = counter.most_common(10)
+    approx = top.result()
+    found = len({key for key, _ in exact} & {key for key, _ in approx})
+    max_count_error = max(abs(count - counter[key]) for key, count in approx)
+
+    print(f"linie: {args.lines}, rozne hosty: {len(counter)}")
+    print(f"dokladnie: {counter_time + days_time:.2f} s, {(counter_memory + days_memory) / 2**20:.1f} MB")
+    print(f"szkice:    {sketch_time:.2f} s, {sketch_memory / 2**20:.1f} MB")
+    print(f"top-10: {found}/10 trafionych, maks. blad licznika {max_count_error} "
+          f"(gwarancja <= {args.lines // top.summary.capacity})")
+    for day, count in distinct.result().items():
+        real = len(days[day])
+        print(f"{day}: {count} vs {real} ({abs(count - real) / real:.2%})")
+
+
+if __name__ == "__main__":
+    main()
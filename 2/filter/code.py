@@ -2,27 +2,27 @@
 # E)
 
 import sys
-from typing import Iterable
+from typing import Iterable, Iterator
 
 
-def filter_code(lines: Iterable[str], search_code: int) -> list[str]:
-    res: list[str] = []
+def match_code(tokens: list[str], search_code: int) -> bool:
+    code = tokens[-2]
+    return int(code) == search_code
+
 
+def iter_code(lines: Iterable[str], search_code: int) -> Iterator[str]:
     for line in lines:
-        tokens = line.split(" ")
-        code = tokens[-2]
+        if match_code(line.split(" "), search_code):
+            yield line.rstrip()
 
-        if int(code) == search_code:
-            res.append(line.rstrip())
 
-    return res
+def filter_code(lines: Iterable[str], search_code: int) -> list[str]:
+    return list(iter_code(lines, search_code))
 
 
 def main() -> None:
     try:
-        lines = filter_code(sys.stdin, 200)
-        for line in lines:
-            print(line)
+        sys.stdout.writelines(line + "\n" for line in iter_code(sys.stdin, 200))
     except ValueError:
         print("Malformed data")
 
@@ -2,27 +2,28 @@
 # G)
 
 import sys
-from datetime import datetime
-from typing import Iterable, Literal
+from typing import Iterable, Iterator, Literal
 
-def filter_day_of_the_week(lines: Iterable[str], day: Literal[0,1,2,3,4,5,6]) -> list[str]:
-    res: list[str] = []
-    
+from timestamps import parse_access_date
+
+
+def match_day_of_the_week(tokens: list[str], day: Literal[0,1,2,3,4,5,6]) -> bool:
+    # tokens[3] == "[01/Jul/1995:00:00:01"
+    return parse_access_date(tokens[3][1:12]).weekday() == day
+
+def iter_day_of_the_week(lines: Iterable[str], day: Literal[0,1,2,3,4,5,6]) -> Iterator[str]:
     for line in lines:
-        date_str = line.split("[")[1].split(":")[0]
-        date = datetime.strptime(date_str, "%d/%b/%Y")
-        
-        if date.weekday() == day:
-            res.append(line.rstrip())
-    
-    return res
+        if match_day_of_the_week(line.split(" "), day):
+            yield line.rstrip()
+
+def filter_day_of_the_week(lines: Iterable[str], day: Literal[0,1,2,3,4,5,6]) -> list[str]:
+    return list(iter_day_of_the_week(lines, day))
 
 def main() -> None:
     try:
-        lines = filter_day_of_the_week(sys.stdin, 4) # only friday
+        lines = iter_day_of_the_week(sys.stdin, 4) # only friday
         
-        for line in lines:
-            print(line)
+        sys.stdout.writelines(line + "\n" for line in lines)
     except ValueError:
         print("Malformed data")
 
@@ -2,26 +2,28 @@
 # F)
 
 import sys
-from typing import Iterable
+from typing import Iterable, Iterator
 
 
-def filter_hours(lines: Iterable[str]) -> list[str]:
-    res: list[str] = []
+def match_hours(tokens: list[str]) -> bool:
+    # tokens[3] == "[01/Jul/1995:00:00:01"
+    hour = int(tokens[3].split(":")[1])
+    return hour < 6 or hour >= 22
+
 
+def iter_hours(lines: Iterable[str]) -> Iterator[str]:
     for line in lines:
-        hour = int(line.split("[")[1].split(":")[1])
+        if match_hours(line.split(" ")):
+            yield line.rstrip()
 
-        if hour < 6 or hour >= 22:
-            res.append(line.rstrip())
 
-    return res
+def filter_hours(lines: Iterable[str]) -> list[str]:
+    return list(iter_hours(lines))
 
 
 def main() -> None:
     try:
-        lines = filter_hours(sys.stdin)
-        for line in lines:
-            print(line)
+        sys.stdout.writelines(line + "\n" for line in iter_hours(sys.stdin))
     except ValueError:
         print("Malformed data")
 
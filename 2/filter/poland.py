@@ -3,27 +3,26 @@
 
 import sys
 from datetime import datetime
-from typing import Iterable
+from typing import Iterable, Iterator
 
-def filter_top_domain(lines: Iterable[str], top_domain: str) -> list[str]:
-    res: list[str] = []
-    
+def match_top_domain(tokens: list[str], top_domain: str) -> bool:
+    domain = tokens[0]
+    top = domain.split(".")[-1]
+    return top == top_domain
+
+def iter_top_domain(lines: Iterable[str], top_domain: str) -> Iterator[str]:
     for line in lines:
-        tokens = line.split(" ")
-        domain = tokens[0]
-        top = domain.split(".")[-1]
-        
-        if top == top_domain:
-            res.append(line.rstrip())
-    
-    return res
+        if match_top_domain(line.split(" "), top_domain):
+            yield line.rstrip()
+
+def filter_top_domain(lines: Iterable[str], top_domain: str) -> list[str]:
+    return list(iter_top_domain(lines, top_domain))
 
 def main() -> None:
     try:
-        lines = filter_top_domain(sys.stdin, "pl") # only ending with .pl
+        lines = iter_top_domain(sys.stdin, "pl") # only ending with .pl
         
-        for line in lines:
-            print(line)
+        sys.stdout.writelines(line + "\n" for line in lines)
     except ValueError:
         print("Malformed data")
 
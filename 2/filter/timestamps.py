@@ -0,0 +1 @@
+../../common/timestamps.py
\ No newline at end of file
@@ -0,0 +1,116 @@
+# Rownolegle przetwarzanie logu w kawalkach (filtry i funkcje redukujace)
+
+import argparse
+import os
+import sys
+from functools import partial
+from multiprocessing import Pool
+from typing import Any, Callable, Iterator
+
+from aggregate import AGGREGATORS, Aggregator, feed, make_aggregators, print_results
+from filter.code import filter_code
+from filter.friday import filter_day_of_the_week
+from filter.night import filter_hours
+from filter.poland import filter_top_domain
+
+
+def split_file(path: str, chunks: int) -> list[tuple[int, int]]:
+    # byte ranges [start, end) that always end right after a newline
+    size = os.path.getsize(path)
+    step = max(1, size // max(1, chunks))
+    ranges: list[tuple[int, int]] = []
+
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + step, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def read_chunk(path: str, start: int, end: int) -> Iterator[str]:
+    # line by line, so a worker never holds more than one line of its chunk
+    with open(path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
+def filter_chunk(path: str, name: str, arg: Any, span: tuple[int, int]) -> list[str]:
+    function, _ = FILTERS[name]
+    lines = read_chunk(path, *span)
+    return function(lines) if arg is None else function(lines, arg)
+
+
+def reduce_chunk(path: str, names: list[str], span: tuple[int, int]) -> dict[str, Aggregator]:
+    return feed(read_chunk(path, *span), make_aggregators(names))
+
+
+# name -> (filter function, argument parser or None when the filter takes no argument)
+FILTERS: dict[str, tuple[Callable[..., list[str]], Callable[[str], Any] | None]] = {
+    "code": (filter_code, int),
+    "night": (filter_hours, None),
+    "weekday": (filter_day_of_the_week, int),
+    "domain": (filter_top_domain, str),
+}
+
+
+def parallel_filter(path: str, name: str, arg: Any, jobs: int) -> Iterator[list[str]]:
+    # imap keeps the chunks in file order, so the output order is the same as in the sequential version
+    with Pool(jobs) as pool:
+        yield from pool.imap(partial(filter_chunk, path, name, arg), split_file(path, jobs * 4))
+
+
+def parallel_reduce(path: str, names: list[str], jobs: int) -> dict[str, Any]:
+    with Pool(jobs) as pool:
+        partials = pool.map(partial(reduce_chunk, path, names), split_file(path, jobs * 4))
+
+    merged = make_aggregators(names)
+    for chunk in partials:
+        for name, aggregator in chunk.items():
+            merged[name].merge(aggregator)
+
+    return {name: aggregator.result() for name, aggregator in merged.items()}
+
+
+parser = argparse.ArgumentParser(description="Rownolegle filtrowanie i redukcja logu")
+parser.add_argument("file", help="Plik z logiem")
+parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Liczba procesow")
+mode = parser.add_mutually_exclusive_group(required=True)
+mode.add_argument("--filter", nargs="+", metavar=("NAME", "ARG"), help=f"Filtr: {', '.join(FILTERS)}")
+mode.add_argument("--reduce", nargs="+", metavar="STAT", help=f"Statystyki: {', '.join(AGGREGATORS)}")
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    try:
+        if args.filter:
+            name, *rest = args.filter
+            if name not in FILTERS:
+                parser.error(f"unknown filter: {name}")
+            convert = FILTERS[name][1]
+            if (convert is None) != (len(rest) == 0) or len(rest) > 1:
+                parser.error(f"wrong number of arguments for filter {name}")
+            arg = convert(rest[0]) if convert else None
+
+            for lines in parallel_filter(args.file, name, arg, args.jobs):
+                sys.stdout.writelines(line + "\n" for line in lines)
+        else:
+            for name in args.reduce:
+                if name not in AGGREGATORS:
+                    parser.error(f"unknown stat: {name}")
+            print_results(parallel_reduce(args.file, list(dict.fromkeys(args.reduce)), args.jobs))
+    except ValueError:
+        print("Malformed data")
+
+
+if __name__ == "__main__":
+    main()
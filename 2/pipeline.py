@@ -0,0 +1,106 @@
+# Wszystkie filtry i funkcje redukujace w jednym procesie:
+# kazda linia jest dzielona raz, a warunki sa sprawdzane od najtanszego
+
+import argparse
+import sys
+from typing import Any, Callable, Iterable, Iterator
+
+from aggregate import AGGREGATORS, make_aggregators, print_results
+from filter.code import match_code
+from filter.friday import match_day_of_the_week
+from filter.night import match_hours
+from filter.poland import match_top_domain
+
+Predicate = Callable[[list[str]], bool]
+
+# name -> (predicate, relative cost per line)
+PREDICATES: dict[str, tuple[Callable[..., bool], int]] = {
+    "domain": (match_top_domain, 1),
+    "code": (match_code, 2),
+    "night": (match_hours, 3),
+    "weekday": (match_day_of_the_week, 4),
+}
+
+
+def bind(predicate: Callable[[list[str], Any], bool], arg: Any) -> Predicate:
+    return lambda tokens: predicate(tokens, arg)
+
+
+def compile_predicates(filters: dict[str, Any]) -> Predicate:
+    # filters: name -> argument (None for filters without one)
+    predicates: list[Predicate] = [
+        PREDICATES[name][0] if arg is None else bind(PREDICATES[name][0], arg)
+        for name, arg in sorted(filters.items(), key=lambda item: PREDICATES[item[0]][1])
+    ]
+
+    if not predicates:
+        return lambda tokens: True
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def check(tokens: list[str]) -> bool:
+        for predicate in predicates:
+            if not predicate(tokens):
+                return False
+        return True
+
+    return check
+
+
+def run_filters(lines: Iterable[str], check: Predicate) -> Iterator[str]:
+    for line in lines:
+        if check(line.split(" ")):
+            yield line.rstrip()
+
+
+def run_reducers(lines: Iterable[str], check: Predicate, names: Iterable[str]) -> dict[str, Any]:
+    aggregators = make_aggregators(names)
+    updates = [aggregator.update for aggregator in aggregators.values()]
+
+    for line in lines:
+        tokens = line.split(" ")
+        if check(tokens):
+            for update in updates:
+                update(tokens)
+
+    return {name: aggregator.result() for name, aggregator in aggregators.items()}
+
+
+parser = argparse.ArgumentParser(description="Filtry i statystyki logu w jednym przebiegu")
+parser.add_argument("--code", type=int, help="Tylko podany kod odpowiedzi")
+parser.add_argument("--night", action="store_true", help="Tylko zapytania miedzy 22 a 6")
+parser.add_argument("--weekday", type=int, choices=range(7), help="Tylko podany dzien tygodnia (0 - poniedzialek)")
+parser.add_argument("--domain", type=str, help="Tylko hosty z podana domena najwyzszego poziomu")
+parser.add_argument("--reduce", nargs="+", metavar="STAT",
+                    help=f"Zamiast linii wypisz statystyki: {', '.join(AGGREGATORS)}")
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    filters: dict[str, Any] = {}
+    if args.code is not None:
+        filters["code"] = args.code
+    if args.night:
+        filters["night"] = None
+    if args.weekday is not None:
+        filters["weekday"] = args.weekday
+    if args.domain is not None:
+        filters["domain"] = args.domain
+
+    check = compile_predicates(filters)
+
+    try:
+        if args.reduce:
+            for name in args.reduce:
+                if name not in AGGREGATORS:
+                    parser.error(f"unknown stat: {name}")
+            print_results(run_reducers(sys.stdin, check, dict.fromkeys(args.reduce)))
+        else:
+            sys.stdout.writelines(line + "\n" for line in run_filters(sys.stdin, check))
+    except ValueError:
+        print("Malformed data")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,28 +4,47 @@
 import sys
 from typing import Iterable
 
-def find_biggest(lines: Iterable[str]) -> tuple[str, int]:
-    current_size = 0
-    current_address = ""
-    for line in lines:
-        tokens = line.split(" ")
+class BiggestFinder:
+    def __init__(self) -> None:
+        self.size = 0
+        self.address = ""
+
+    def update(self, tokens: list[str]) -> None:
         try:
             size = int(tokens[-1].strip())
-            if size > current_size:
-                current_size = size
-                current_address = str(tokens[-4].strip())
+            if size > self.size:
+                self.size = size
+                self.address = str(tokens[-4].strip())
         except:
             pass
-    return current_address, current_size
+
+    def merge(self, other: "BiggestFinder") -> None:
+        if other.size > self.size:
+            self.size = other.size
+            self.address = other.address
+
+    def result(self) -> tuple[str, int]:
+        return self.address, self.size
+
+
+def find_biggest(lines: Iterable[str]) -> tuple[str, int]:
+    finder = BiggestFinder()
+    for line in lines:
+        finder.update(line.split(" "))
+    return finder.result()
+
+
+def print_biggest(ans: tuple[str, int]) -> None:
+    print("sciezka: ", ans[0], "\nwielkosc: ", ans[1])
 
 
 def main() -> None:
     try:
         ans = find_biggest(sys.stdin)
-        print("sciezka: ", ans[0], "\nwielkosc: ", ans[1])
+        print_biggest(ans)
     except ValueError:
         print("Malformed data")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
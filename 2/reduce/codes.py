@@ -4,34 +4,52 @@
 import sys
 from typing import Iterable
 
-def count_codes(lines: Iterable[str]) -> dict[int, int]:
-    codes = {}
+class CodeCounter:
+    def __init__(self) -> None:
+        self.codes: dict[int, int] = {}
 
-    for line in lines:
-        tokens = line.split(" ")
+    def update(self, tokens: list[str]) -> None:
         code = int(tokens[-2].strip())
-        
-        if code not in codes:
-            codes[code] = 1
+
+        if code not in self.codes:
+            self.codes[code] = 1
         else:
-            codes[code] += 1
+            self.codes[code] += 1
+
+    def merge(self, other: "CodeCounter") -> None:
+        for code, count in other.codes.items():
+            self.codes[code] = self.codes.get(code, 0) + count
+
+    def result(self) -> dict[int, int]:
+        return self.codes
+
+
+def count_codes(lines: Iterable[str]) -> dict[int, int]:
+    counter = CodeCounter()
+
+    for line in lines:
+        counter.update(line.split(" "))
     
-    return codes
+    return counter.result()
+
+def print_codes(codes: dict[int, int]) -> None:
+    codes = dict(codes)
+
+    if not 200 in codes.keys():
+        codes[200] = 0
+    if not 302 in codes.keys():
+        codes[302] = 0
+    if not 404 in codes.keys():
+        codes[404] = 0
+
+    print(f"200: {codes[200]}")
+    print(f"302: {codes[302]}")
+    print(f"404: {codes[404]}")
 
 def main() -> None:
     try:
         codes = count_codes(sys.stdin)
-        
-        if not 200 in codes.keys():
-            codes[200] = 0
-        if not 302 in codes.keys():
-            codes[302] = 0
-        if not 404 in codes.keys():
-            codes[404] = 0
-
-        print(f"200: {codes[200]}")
-        print(f"302: {codes[302]}")
-        print(f"404: {codes[404]}")
+        print_codes(codes)
     except ValueError:
         print("Malformed data")
 
@@ -4,24 +4,39 @@
 import sys
 from typing import Iterable
 
-def sum_sizes(lines: Iterable[str]) -> int:
-    bytes = 0
+class SizeSum:
+    def __init__(self) -> None:
+        self.bytes = 0
 
-    for line in lines:
-        tokens = line.split(" ")
+    def update(self, tokens: list[str]) -> None:
         if tokens[-1].strip() == "-":
             # skip when no size (404)
-            continue
-        
-        size = int(tokens[-1].strip())
-        bytes += size
+            return
+
+        self.bytes += int(tokens[-1].strip())
+
+    def merge(self, other: "SizeSum") -> None:
+        self.bytes += other.bytes
+
+    def result(self) -> int:
+        return self.bytes
+
+
+def sum_sizes(lines: Iterable[str]) -> int:
+    summer = SizeSum()
+
+    for line in lines:
+        summer.update(line.split(" "))
     
-    return bytes
+    return summer.result()
+
+def print_sizes(bytes: int) -> None:
+    print(bytes)
 
 def main() -> None:
     try:
         bytes = sum_sizes(sys.stdin)
-        print(bytes)
+        print_sizes(bytes)
     except ValueError:
         print("Malformed data")
 
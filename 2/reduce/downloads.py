@@ -4,24 +4,44 @@
 import sys
 from typing import Iterable
 
+IMAGE_EXTENSIONS = (".gif", ".jpg", ".jpeg", ".xbm")
+
+class ImageRatio:
+    def __init__(self) -> None:
+        self.total_req = 0
+        self.image_req = 0
+
+    def update(self, tokens: list[str]) -> None:
+        self.total_req += 1
+        if tokens[-4].endswith(IMAGE_EXTENSIONS):
+            self.image_req += 1
+
+    def merge(self, other: "ImageRatio") -> None:
+        self.total_req += other.total_req
+        self.image_req += other.image_req
+
+    def result(self) -> float:
+        return self.image_req/self.total_req if self.total_req != 0 else 0
+
+
 def find_ratio(lines: Iterable[str]) -> float:
-    total_req = 0
-    image_req = 0
+    ratio = ImageRatio()
     for line in lines:
-        tokens = line.split(" ")
-        total_req += 1
-        if tokens[-4].endswith((".gif", ".jpg", ".jpeg", ".xbm")):
-            image_req += 1
-    return image_req/total_req
+        ratio.update(line.split(" "))
+    return ratio.result()
+
+
+def print_ratio(ans: float) -> None:
+    print(f"stosunek pobran grafiki do innych rzeczy: {ans:.2f}")
 
 
 def main() -> None:
     try:
         ans = find_ratio(sys.stdin)
-        print(f"stosunek pobran grafiki do innych rzeczy: {ans:.2f}")
+        print_ratio(ans)
     except ValueError:
         print("Malformed data")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,189 @@
+# Funkcje redukujące - przyblizone
+# top-K (Space-Saving) i liczba roznych hostow na dzien (HyperLogLog)
+
+import heapq
+import math
+import sys
+from hashlib import blake2b
+from typing import Iterable
+
+# default error bounds, relative to the number of lines / distinct keys
+TOP_K = 10
+TOP_ERROR = 0.001
+DISTINCT_ERROR = 0.01
+
+
+def hash64(key: str) -> int:
+    # the built-in hash() is salted per process, so partial results from
+    # different processes could not be merged with it
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class SpaceSaving:
+    # keeps at most `capacity` counters; every count is overestimated by at most lines / capacity
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+
+    def add(self, key: str) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (1, key))
+        else:
+            minimum, victim = self._pop_min()
+            del counts[victim], self.errors[victim]
+            counts[key] = minimum + 1
+            self.errors[key] = minimum
+            heapq.heappush(self._heap, (minimum + 1, key))
+
+    def _pop_min(self) -> tuple[int, str]:
+        # heap entries are not updated on every increment, stale ones are refreshed here
+        heap = self._heap
+        while True:
+            count, key = heapq.heappop(heap)
+            current = self.counts.get(key)
+            if current == count:
+                return count, key
+            if current is not None:
+                heapq.heappush(heap, (current, key))
+
+    def minimum(self) -> int:
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: "SpaceSaving") -> None:
+        own_min, other_min = self.minimum(), other.minimum()
+        counts: dict[str, int] = {}
+        errors: dict[str, int] = {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, own_min) + other.counts.get(key, other_min)
+            errors[key] = self.errors.get(key, own_min) + other.errors.get(key, other_min)
+
+        kept = heapq.nlargest(self.capacity, counts, key=counts.__getitem__)
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        return heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+
+
+class HyperLogLog:
+    def __init__(self, error: float = DISTINCT_ERROR) -> None:
+        # standard error is about 1.04 / sqrt(2 ** p)
+        self.p = min(18, max(4, math.ceil(math.log2((1.04 / error) ** 2))))
+        self.registers = bytearray(1 << self.p)
+
+    def add(self, key: str) -> None:
+        h = hash64(key)
+        rest_bits = 64 - self.p
+        idx = h >> rest_bits
+        rank = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLogs with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class TopKeys:
+    # approximate top-k of one token of the line (tokens[0] - host, tokens[-4] - path)
+    def __init__(self, position: int, k: int = TOP_K, error: float = TOP_ERROR) -> None:
+        self.position = position
+        self.k = k
+        self.summary = SpaceSaving(max(k, math.ceil(1 / error)))
+
+    def update(self, tokens: list[str]) -> None:
+        self.summary.add(tokens[self.position])
+
+    def merge(self, other: "TopKeys") -> None:
+        self.summary.merge(other.summary)
+
+    def result(self) -> list[tuple[str, int]]:
+        return self.summary.top(self.k)
+
+
+class TopPaths(TopKeys):
+    def __init__(self, k: int = TOP_K, error: float = TOP_ERROR) -> None:
+        super().__init__(-4, k, error)
+
+
+class TopHosts(TopKeys):
+    def __init__(self, k: int = TOP_K, error: float = TOP_ERROR) -> None:
+        super().__init__(0, k, error)
+
+
+class DistinctHostsPerDay:
+    def __init__(self, error: float = DISTINCT_ERROR) -> None:
+        self.error = error
+        self.days: dict[str, HyperLogLog] = {}
+
+    def update(self, tokens: list[str]) -> None:
+        day = tokens[3][1:12]   # "[01/Jul/1995:00:00:01" -> "01/Jul/1995"
+        sketch = self.days.get(day)
+        if sketch is None:
+            sketch = self.days[day] = HyperLogLog(self.error)
+        sketch.add(tokens[0])
+
+    def merge(self, other: "DistinctHostsPerDay") -> None:
+        for day, sketch in other.days.items():
+            if day in self.days:
+                self.days[day].merge(sketch)
+            else:
+                self.days[day] = sketch
+
+    def result(self) -> dict[str, int]:
+        return {day: sketch.count() for day, sketch in self.days.items()}
+
+
+def print_top(top: list[tuple[str, int]]) -> None:
+    for key, count in top:
+        print(f"{count} {key}")
+
+
+def print_distinct(days: dict[str, int]) -> None:
+    for day, count in days.items():
+        print(f"{day}: ~{count}")
+
+
+def reduce_lines(lines: Iterable[str], *reducers: TopKeys | DistinctHostsPerDay) -> None:
+    for line in lines:
+        tokens = line.split(" ")
+        for reducer in reducers:
+            reducer.update(tokens)
+
+
+def main() -> None:
+    try:
+        paths, hosts, distinct = TopPaths(), TopHosts(), DistinctHostsPerDay()
+        reduce_lines(sys.stdin, paths, hosts, distinct)
+
+        print("najczesciej pobierane sciezki:")
+        print_top(paths.result())
+        print("najaktywniejsze hosty:")
+        print_top(hosts.result())
+        print("rozne hosty na dzien:")
+        print_distinct(distinct.result())
+    except ValueError:
+        print("Malformed data")
+
+
+if __name__ == "__main__":
+    main()
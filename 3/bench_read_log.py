@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from lists_and_tuples import read_log
+from mmap_log import read_log_mmap
+
+HOSTS = ["199.72.81.55", "unicomp6.unicomp.net", "burger.letters.com", "d104.aa.net", "kgtyk4.kj.yamagata-u.ac.jp"]
+PATHS = ["/history/apollo/", "/shuttle/countdown/", "/images/NASA-logosmall.gif", "/shuttle/countdown/video/livevideo.jpeg"]
+CODES = ["200", "200", "200", "302", "304", "404"]
+
+
+def write_sample_log(path: str, megabytes: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    limit = megabytes * 1024 * 1024
+    second = 0
+    with open(path, "w") as f:
+        while f.tell() < limit:
+            second += rnd.randint(0, 2)
+            day, rest = divmod(second, 86400)
+            code = rnd.choice(CODES)
+            size = "-" if code == "404" else str(rnd.randint(0, 100000))
+            f.write(f'{rnd.choice(HOSTS)} - - [{day % 28 + 1:02d}/Jul/1995:{rest // 3600:02d}:{rest // 60 % 60:02d}:'
+                    f'{rest % 60:02d} -0400] "GET {rnd.choice(PATHS)} HTTP/1.0" {code} {size}\n')
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark read_log vs read_log_mmap")
+    parser.add_argument("-m", "--megabytes", type=int, default=1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "access.log")
+        write_sample_log(path, args.megabytes)
+
+        with open(path) as f:
+            stdin, sys.stdin = sys.stdin, f
+            try:
+                base, expected = timed(read_log)
+            finally:
+                sys.stdin = stdin
+
+        full, result = timed(lambda: read_log_mmap(path))
+        assert result == expected
+        del result, expected
+
+        codes, _ = timed(lambda: read_log_mmap(path, ["status_code", "size"]))
+
+    # cel to 5x szybciej niz read_log; osiaga go tylko odczyt wybranych pol - przy wszystkich
+    # polach oba czytniki i tak buduja datetime dla kazdej linii (timestamps.py), stad ~1x
+    print(f"plik: {args.megabytes} MB, cel: 5x szybciej niz read_log (tylko przy wybranych polach)")
+    print(f"read_log:                         {base:.2f} s")
+    print(f"read_log_mmap (wszystkie pola):   {full:.2f} s ({base / full:.1f}x)")
+    print(f"read_log_mmap (status_code, size): {codes:.2f} s ({base / codes:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,75 @@
 import sys
 from datetime import datetime
-from typing import Dict, Tuple, TypedDict
+from typing import Dict, Iterable, Tuple, TypedDict
+
+from log_index import LogIndex
+from log_table import LogTable
+from mmap_log import FIELDS
+from timestamps import parse_access_time
 
 # CZESC 2
 
+def parse_log_line(line: str) -> Tuple:
+    tokens = line.rstrip().split()
+    
+    hostname: str = tokens[0]
+    
+    date_str = line.split("[")[1].split("]")[0]
+    date: datetime = parse_access_time(date_str)
+    
+    request_details: str = line.split('"')[1].split('"')[0]
+    
+    status_code: int = int(tokens[-2])
+    size: int = int(tokens[-1]) if tokens[-1] != "-" else 0
+    
+    return (hostname, date, request_details, status_code, size)
+
 def read_log() -> list[Tuple]:
     res: list[Tuple] = []
     
     for line in sys.stdin:
-        tokens = line.rstrip().split()
-        
-        hostname: str = tokens[0]
-        
-        date_str = line.split("[")[1].split("]")[0]
-        date: datetime = datetime.strptime(date_str, "%d/%b/%Y:%H:%M:%S %z")
-        
-        request_details: str = line.split('"')[1].split('"')[0]
-        
-        status_code: int = int(tokens[-2])
-        size: int = int(tokens[-1]) if tokens[-1] != "-" else 0
-        
-        res.append((hostname, date, request_details, status_code, size))
+        res.append(parse_log_line(line))
     
     return res
         
 
-def sort_log(log_list: list[Tuple], idx: int) -> list[Tuple]:
+def sort_log(log_list: list[Tuple] | LogTable, idx: int) -> list[Tuple] | LogTable:
+    if isinstance(log_list, LogTable):
+        if idx >= len(FIELDS):
+            raise ValueError("idx >= tuple size")
+        return log_list.sort_by(FIELDS[idx])
+
     if idx >= len(log_list[0]):
         raise ValueError("idx >= tuple size")
     
     return sorted(log_list, key=lambda x: x[idx])
 
-def get_entries_by_addr(log_list: list[Tuple], hostname: str) -> list[Tuple]:
+def get_entries_by_addr(log_list: list[Tuple] | LogTable | LogIndex, hostname: str) -> list[Tuple] | LogTable:
+    if isinstance(log_list, LogIndex):
+        return list(map(parse_log_line, log_list.lines(log_list.lookup(log_list.hosts, [hostname.rstrip()]))))
+    if isinstance(log_list, LogTable):
+        return log_list.filter_host(hostname.rstrip())
+
     return list(filter(lambda x: x[0] == hostname.rstrip(), log_list))
 
-def get_entries_by_code(log_list: list[Tuple], status_code: int) -> list[Tuple]:
+def get_entries_by_code(log_list: list[Tuple] | LogTable | LogIndex, status_code: int) -> list[Tuple] | LogTable:
+    if isinstance(log_list, LogIndex):
+        return list(map(parse_log_line, log_list.lines(log_list.lookup(log_list.codes, [status_code]))))
+    if isinstance(log_list, LogTable):
+        return log_list.filter_code(status_code)
+
     return list(filter(lambda x: x[-2] == status_code, log_list))
 
-def get_failed_reads(log_list: list[Tuple], joined: bool) -> list[Tuple] | Tuple[list[Tuple], list[Tuple]]:
+def get_failed_reads(log_list: list[Tuple] | LogTable | LogIndex, joined: bool) -> list[Tuple] | Tuple[list[Tuple], list[Tuple]] | Tuple[LogTable, LogTable]:
+    if isinstance(log_list, LogIndex):
+        log_4xx = list(map(parse_log_line, log_list.lines(log_list.lookup(log_list.codes, range(400, 500)))))
+        log_5xx = list(map(parse_log_line, log_list.lines(log_list.lookup(log_list.codes, range(500, 600)))))
+        return log_4xx + log_5xx if joined else log_4xx, log_5xx
+    if isinstance(log_list, LogTable):
+        idx_4xx = log_list.where_in("status_code", range(400, 500))
+        idx_5xx = log_list.where_in("status_code", range(500, 600))
+        return log_list.take(idx_4xx + idx_5xx if joined else idx_4xx), log_list.take(idx_5xx)
+
     log_4xx = []
     log_5xx = []
     
@@ -49,10 +81,24 @@ def get_failed_reads(log_list: list[Tuple], joined: bool) -> list[Tuple] | Tuple
             
     return log_4xx + log_5xx if joined else log_4xx, log_5xx
 
-def get_entries_by_extension(log_list: list[Tuple], extention: str) -> list[Tuple]:
+def get_entries_by_extension(log_list: list[Tuple] | LogTable | LogIndex, extention: str) -> list[Tuple] | LogTable:
+    if isinstance(log_list, LogIndex):
+        # substring match on the request, so there is no bucket to use - scan the indexed part of the file
+        return [entry for entry in map(parse_log_line, log_list.all_lines()) if extention in entry[2]]
+    if isinstance(log_list, LogTable):
+        return log_list.filter_request(lambda request: extention in request)
+
     return list(filter(lambda x: extention in x[2], log_list))
 
-def print_entries(log_list: list[Tuple]) -> None:
+def get_entries_by_hour(log_list: list[Tuple] | LogIndex, hour: datetime) -> list[Tuple]:
+    # entries from the full hour containing `hour` (timezone-aware)
+    bucket = int(hour.timestamp()) // 3600
+    if isinstance(log_list, LogIndex):
+        return list(map(parse_log_line, log_list.lines(log_list.lookup(log_list.hours, [bucket]))))
+
+    return list(filter(lambda x: int(x[1].timestamp()) // 3600 == bucket, log_list))
+
+def print_entries(log_list: list[Tuple] | LogTable) -> None:
     for log in log_list:
         print(log)
 
@@ -87,29 +133,65 @@ def log_to_dict(log: list[Tuple]) -> Dict[str, list[DictEntry]]:
 def get_addresses(log_dict: Dict) -> list[str]:
     return list(log_dict.keys())
 
-def print_dict_entry_dates(log_dict: Dict) -> None:
-    for address, entries in log_dict.items():
-        total_requests = len(entries)
-        successful_requests = sum(1 for entry in entries if entry["status_code"] == 200)
-        first_request_date = min(entry["date"] for entry in entries)
-        last_request_date = max(entry["date"] for entry in entries)
-
-        if total_requests != 0:
-            success_ratio = successful_requests / total_requests
-        else:
-            success_ratio = 0
-
+class HostStats:
+    # running summary of one host, updated entry by entry
+    __slots__ = ("total_requests", "successful_requests", "first_request_date", "last_request_date", "bytes")
+
+    def __init__(self, date: datetime) -> None:
+        self.total_requests: int = 0
+        self.successful_requests: int = 0
+        self.first_request_date: datetime = date
+        self.last_request_date: datetime = date
+        self.bytes: int = 0
+
+    def update(self, date: datetime, status_code: int, size: int) -> None:
+        self.total_requests += 1
+        if status_code == 200:
+            self.successful_requests += 1
+        if date < self.first_request_date:
+            self.first_request_date = date
+        if date > self.last_request_date:
+            self.last_request_date = date
+        self.bytes += size
+
+    @property
+    def success_ratio(self) -> float:
+        return self.successful_requests / self.total_requests if self.total_requests != 0 else 0
+
+def update_host_stats(stats: Dict[str, HostStats], log: Iterable[Tuple]) -> Dict[str, HostStats]:
+    # log can be a stream (e.g. map(parse_log_line, file)); call again with new lines to refresh
+    for hostname, date, _, status_code, size in log:
+        host = stats.get(hostname)
+        if host is None:
+            host = stats[hostname] = HostStats(date)
+        host.update(date, status_code, size)
+    return stats
+
+def print_host_stats(stats: Dict[str, HostStats]) -> None:
+    for address, host in stats.items():
         print(f"IP/Address: {address}")
-        print(f"  Total Requests: {total_requests}")
-        print(f"  First Request Date: {first_request_date}")
-        print(f"  Last Request Date: {last_request_date}")
-        print(f"  Success Ratio: {success_ratio}")
+        print(f"  Total Requests: {host.total_requests}")
+        print(f"  First Request Date: {host.first_request_date}")
+        print(f"  Last Request Date: {host.last_request_date}")
+        print(f"  Success Ratio: {host.success_ratio}")
         print()
 
+def print_dict_entry_dates(log_dict: Dict) -> None:
+    stats: Dict[str, HostStats] = {}
+    for address, entries in log_dict.items():
+        update_host_stats(stats, ((address, entry["date"], entry["request_details"], entry["status_code"], entry["size"])
+                                  for entry in entries))
+    print_host_stats(stats)
+
 
 def main() -> None:
-    log_list = read_log()
-    
+    # host summaries straight from the stream, without keeping the entries
+    stats = update_host_stats({}, map(parse_log_line, sys.stdin))
+    print_host_stats(stats)
+
+    # log_list = read_log()
+    # log_table = LogTable.from_tuples(log_list)  # or LogTable.from_file(path)
+    # log_index = LogIndex.open(path)  # get_entries_by_addr/code/hour read only matching lines
     # print(log_list)
     # print(sort_log(log_list, 4))
     # print(get_entries_by_addr(log_list, "burger.letters.com"))
@@ -118,8 +200,8 @@ def main() -> None:
     # print(get_entries_by_extension(log_list, "jpg"))
     # print_entries(log_list)
 
-    log_dict = log_to_dict(log_list)
-    print_dict_entry_dates(log_dict)
+    # log_dict = log_to_dict(log_list)
+    # print_dict_entry_dates(log_dict)
 
 if __name__ == "__main__":
     main()
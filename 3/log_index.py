@@ -0,0 +1,162 @@
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable, Iterator
+
+from timestamps import parse_access_time
+
+INDEX_VERSION = 2
+HEAD_SIZE = 256
+
+# index file: header and the head of the log, then hosts, codes and hours; every one of
+# them is a key count and, per key, its text, the number of offsets and the offsets
+# as a raw array("Q") in the byte order of the machine that wrote it
+INDEX_MAGIC = b"LOGIDX\0\0"
+_HEADER = struct.Struct("<8sH?QH")      # magic, version, little-endian offsets, indexed size, head size
+_COUNT = struct.Struct("<I")
+_KEY = struct.Struct("<HQ")             # key size, number of offsets
+
+
+class LogIndex:
+    # sidecar index (<log>.idx): byte offsets of lines by host, status code and hour;
+    # when the log grows only the new part is scanned
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.index_path = path + ".idx"
+        self.size = 0
+        self.head = b""
+        self.hosts: dict[str, array] = {}
+        self.codes: dict[int, array] = {}
+        self.hours: dict[int, array] = {}   # epoch hour -> offsets
+
+    @classmethod
+    def open(cls, path: str) -> "LogIndex":
+        index = cls(path)
+        index._load()
+        if index.update():
+            index.save()
+        return index
+
+    def _load(self) -> None:
+        # a missing, old, damaged or foreign index is simply rebuilt
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, version, little, size, head_size = _HEADER.unpack(_read(f, _HEADER.size))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION or little != (sys.byteorder == "little"):
+                    return
+                head = _read(f, head_size)
+                hosts = _read_bucket(f, str)
+                codes = _read_bucket(f, int)
+                hours = _read_bucket(f, int)
+        except (FileNotFoundError, EOFError, ValueError, struct.error):
+            return
+
+        self.size, self.head = size, head
+        self.hosts, self.codes, self.hours = hosts, codes, hours
+
+    def save(self) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, sys.byteorder == "little", self.size, len(self.head)))
+            f.write(self.head)
+            for bucket in (self.hosts, self.codes, self.hours):
+                _write_bucket(f, bucket)
+        os.replace(tmp_path, self.index_path)
+
+    def _reset(self) -> None:
+        self.size = 0
+        self.head = b""
+        self.hosts, self.codes, self.hours = {}, {}, {}
+
+    def update(self) -> bool:
+        # returns True when something new was indexed
+        with open(self.path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+            size = os.fstat(f.fileno()).st_size
+
+            # truncated or replaced (rotated) log - start from scratch
+            if size < self.size or head[:len(self.head)] != self.head:
+                self._reset()
+            if size == self.size:
+                return False
+
+            f.seek(self.size)
+            offset = self.size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # half-written last line, it will be indexed next time
+                    break
+                self._add(line, offset)
+                offset += len(line)
+
+        changed = offset != self.size or self.head != head[:min(HEAD_SIZE, offset)]
+        self.size = offset
+        self.head = head[:min(HEAD_SIZE, offset)]
+        return changed
+
+    def _add(self, line: bytes, offset: int) -> None:
+        tokens = line.split()
+        if len(tokens) < 2:
+            return
+
+        # a malformed line is left out of the index instead of stopping the update
+        try:
+            host = tokens[0].decode()
+            code = int(tokens[-2])
+            start = line.find(b"[") + 1
+            hour = int(parse_access_time(line[start:line.find(b"]", start)]).timestamp()) // 3600
+        except ValueError:
+            return
+
+        for bucket, key in ((self.hosts, host), (self.codes, code), (self.hours, hour)):
+            offsets = bucket.get(key)
+            if offsets is None:
+                offsets = bucket[key] = array("Q")
+            offsets.append(offset)
+
+    def lines(self, offsets: Iterable[int]) -> Iterator[str]:
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield f.readline().decode()
+
+    def all_lines(self) -> Iterator[str]:
+        with open(self.path, "rb") as f:
+            while f.tell() < self.size:
+                yield f.readline().decode()
+
+    def lookup(self, bucket: dict, keys: Iterable) -> list[int]:
+        # offsets of all lines in the given buckets, in file order
+        found = [bucket[key] for key in keys if key in bucket]
+        if len(found) == 1:
+            return list(found[0])
+        return sorted(offset for offsets in found for offset in offsets)
+
+
+def _read(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError("index file is truncated")
+    return data
+
+
+def _read_bucket(f: BinaryIO, key_type: type) -> dict:
+    bucket = {}
+    (count,) = _COUNT.unpack(_read(f, _COUNT.size))
+    for _ in range(count):
+        key_size, length = _KEY.unpack(_read(f, _KEY.size))
+        key = key_type(_read(f, key_size).decode())
+        offsets = bucket[key] = array("Q")
+        offsets.fromfile(f, length)
+    return bucket
+
+
+def _write_bucket(f: BinaryIO, bucket: dict) -> None:
+    f.write(_COUNT.pack(len(bucket)))
+    for key, offsets in bucket.items():
+        text = str(key).encode()
+        f.write(_KEY.pack(len(text), len(offsets)))
+        f.write(text)
+        offsets.tofile(f)
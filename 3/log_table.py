@@ -0,0 +1,144 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import compress
+from typing import Callable, Iterable, Iterator, Tuple
+
+from mmap_log import iter_log_mmap
+
+
+class LogTable:
+    # one array per column instead of one tuple per entry;
+    # hostnames, requests and timezones are stored once and referenced by index
+
+    def __init__(self) -> None:
+        self.hosts = array("I")
+        self.dates = array("q")       # epoch seconds
+        self.offsets = array("h")     # utc offset in minutes
+        self.requests = array("I")
+        self.codes = array("H")
+        self.sizes = array("q")
+
+        self.host_names: list[str] = []
+        self.request_names: list[str] = []
+        self._host_ids: dict[str, int] = {}
+        self._request_ids: dict[str, int] = {}
+        self._timezones: dict[int, timezone] = {}
+
+    @classmethod
+    def from_tuples(cls, log_list: Iterable[Tuple]) -> "LogTable":
+        table = cls()
+        for entry in log_list:
+            table.append(*entry)
+        return table
+
+    @classmethod
+    def from_file(cls, path: str) -> "LogTable":
+        return cls.from_tuples(iter_log_mmap(path))
+
+    def _intern(self, ids: dict[str, int], names: list[str], value: str) -> int:
+        idx = ids.get(value)
+        if idx is None:
+            idx = ids[value] = len(names)
+            names.append(value)
+        return idx
+
+    def append(self, hostname: str, date: datetime, request_details: str, status_code: int, size: int) -> None:
+        offset = date.utcoffset()
+        self.hosts.append(self._intern(self._host_ids, self.host_names, hostname))
+        self.dates.append(int(date.timestamp()))
+        self.offsets.append(int(offset.total_seconds()) // 60 if offset is not None else 0)
+        self.requests.append(self._intern(self._request_ids, self.request_names, request_details))
+        self.codes.append(status_code)
+        self.sizes.append(size)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _timezone(self, minutes: int) -> timezone:
+        tz = self._timezones.get(minutes)
+        if tz is None:
+            tz = self._timezones[minutes] = timezone(timedelta(minutes=minutes))
+        return tz
+
+    def row(self, i: int) -> Tuple:
+        return (
+            self.host_names[self.hosts[i]],
+            datetime.fromtimestamp(self.dates[i], self._timezone(self.offsets[i])),
+            self.request_names[self.requests[i]],
+            self.codes[i],
+            self.sizes[i]
+        )
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return map(self.row, range(len(self)))
+
+    def take(self, indices: Iterable[int]) -> "LogTable":
+        # new table with the given rows; string tables are shared, not copied
+        res = LogTable()
+        res.host_names, res._host_ids = self.host_names, self._host_ids
+        res.request_names, res._request_ids = self.request_names, self._request_ids
+        res._timezones = self._timezones
+
+        indices = array("I", indices)
+        for name in ("hosts", "dates", "offsets", "requests", "codes", "sizes"):
+            column = getattr(self, name)
+            setattr(res, name, array(column.typecode, map(column.__getitem__, indices)))
+        return res
+
+    def column(self, field: str) -> array:
+        return {
+            "hostname": self.hosts,
+            "date": self.dates,
+            "request_details": self.requests,
+            "status_code": self.codes,
+            "size": self.sizes
+        }[field]
+
+    # map/compress run in C, so these scans never execute Python code per row
+
+    def where(self, field: str, predicate: Callable[[int], bool]) -> list[int]:
+        return list(compress(range(len(self)), map(predicate, self.column(field))))
+
+    def where_eq(self, field: str, value: int) -> list[int]:
+        return self.where(field, value.__eq__)
+
+    def where_in(self, field: str, values: Iterable[int]) -> list[int]:
+        return self.where(field, frozenset(values).__contains__)
+
+    def filter_host(self, hostname: str) -> "LogTable":
+        idx = self._host_ids.get(hostname)
+        return self.take(self.where_eq("hostname", idx) if idx is not None else [])
+
+    def filter_code(self, status_code: int) -> "LogTable":
+        return self.take(self.where_eq("status_code", status_code))
+
+    def filter_codes(self, status_codes: Iterable[int]) -> "LogTable":
+        return self.take(self.where_in("status_code", status_codes))
+
+    def filter_request(self, predicate: Callable[[str], bool]) -> "LogTable":
+        # the predicate runs once per distinct request, not once per row
+        matching = [i for i, request in enumerate(self.request_names) if predicate(request)]
+        return self.take(self.where_in("request_details", matching))
+
+    def sort_by(self, field: str) -> "LogTable":
+        if field == "hostname":
+            key: Callable[[int], object] = lambda i: self.host_names[self.hosts[i]]
+        elif field == "request_details":
+            key = lambda i: self.request_names[self.requests[i]]
+        else:
+            key = self.column(field).__getitem__
+        return self.take(sorted(range(len(self)), key=key))
+
+    def group_by(self, field: str) -> dict[int, list[int]]:
+        groups: dict[int, list[int]] = {}
+        for i, value in enumerate(self.column(field)):
+            group = groups.get(value)
+            if group is None:
+                groups[value] = [i]
+            else:
+                group.append(i)
+        return groups
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in
+                   (self.hosts, self.dates, self.offsets, self.requests, self.codes, self.sizes))
@@ -0,0 +1,63 @@
+import mmap
+import os
+from operator import itemgetter
+from typing import Iterable, Iterator, Tuple
+
+from timestamps import parse_access_time
+
+FIELDS = ("hostname", "date", "request_details", "status_code", "size")
+
+
+def iter_log_mmap(path: str, fields: Iterable[str] = FIELDS) -> Iterator[Tuple]:
+    fields = tuple(fields)
+    for field in fields:
+        if field not in FIELDS:
+            raise ValueError(f"unknown field: {field}")
+
+    want_host = "hostname" in fields
+    want_date = "date" in fields
+    want_request = "request_details" in fields
+    want_code = "status_code" in fields
+    want_size = "size" in fields
+    order = [FIELDS.index(field) for field in fields]
+    # itemgetter of a single index returns the value itself, not a 1-tuple
+    pick = itemgetter(*order) if len(order) > 1 else lambda record: tuple([record[i] for i in order])
+
+    record: list = [None] * len(FIELDS)
+    last_raw_date = b""
+
+    with open(path, "rb") as f:
+        # mmap refuses an empty file, and there is nothing to read in it anyway
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                line = line.rstrip()
+                if not line:
+                    continue
+
+                if want_host:
+                    record[0] = line[:line.find(b" ")].decode()
+                if want_date:
+                    start = line.find(b"[") + 1
+                    raw_date = line[start:line.find(b"]", start)]
+                    # neighbouring lines usually share the timestamp
+                    if raw_date != last_raw_date:
+                        record[1] = parse_access_time(raw_date)
+                        last_raw_date = raw_date
+                if want_request:
+                    start = line.find(b'"') + 1
+                    record[2] = line[start:line.find(b'"', start)].decode()
+                if want_code or want_size:
+                    code, size = line.rsplit(b" ", 2)[1:]
+                    if want_code:
+                        record[3] = int(code)
+                    if want_size:
+                        record[4] = int(size) if size != b"-" else 0
+
+                yield pick(record)
+
+
+def read_log_mmap(path: str, fields: Iterable[str] = FIELDS) -> list[Tuple]:
+    # same tuples as read_log(), but only with the requested fields
+    return list(iter_log_mmap(path, fields))
@@ -1,15 +1,21 @@
 from datetime import datetime
-from typing import TypedDict
+from typing import Any, Iterable, Iterator, NamedTuple, TextIO
+import gzip
 import re
 import logging
 import sys
 import random
 import argparse
 
+from follow import BruteforceTracker, follow_bruteforce, follow_lines
+from ipv4 import find_ipv4s, ipv4_to_str
+from rate_windows import SUBNET_MASK, Alert, RateEngine, Threshold, subnet_to_str
+from timestamps import parse_syslog_time
+
 
 # Argparse
 argparser = argparse.ArgumentParser(description="SSH Log Parser")
-argparser.add_argument("file", type=str, help="Path to the log file")
+argparser.add_argument("file", type=str, nargs="+", help="Path to the log file (several files, e.g. rotated logs, are read in order; .gz files are decompressed on the fly)")
 argparser.add_argument("-v", "--verbosity", type=int, default=0, help="Logging verbosity level (0-5)")
 
 sub_parsers = argparser.add_subparsers(
@@ -23,6 +29,7 @@ parser_print_random_user = sub_parsers.add_parser("random_user", help="Print n r
 parser_session_duration_stats = sub_parsers.add_parser("session_duration_stats", help="Print average session duration and std. deviation")
 parser_print_most_least_logged_in_user = sub_parsers.add_parser("most_least_logged_in_user", help="Print most and least logged in user")
 parser_detect_bruteforce = sub_parsers.add_parser("detect_bruteforce", help="Detect bruteforce")
+parser_rate_limits = sub_parsers.add_parser("rate_limits", help="Detect failed logins over several rate thresholds")
 
 parser_print_random_user.add_argument("-n", "--number", type=int, help="Number of logs to print", required=True)
 parser_session_duration_stats.add_argument("-u", "--user", type=str, help="User to calculate stats for (defailt: all)", required=False)
@@ -30,6 +37,10 @@ parser_session_duration_stats.add_argument("-u", "--user", type=str, help="User
 parser_detect_bruteforce.add_argument("-u", "--user", type=str, help="User to detect bruteforce for (default: all)", required=False)
 parser_detect_bruteforce.add_argument("-t", "--max_delay", type=int, help="Max delay between attempts in seconds", default=5)
 parser_detect_bruteforce.add_argument("-a", "--max_attempts", type=int, help="Max attempts", default=3)
+parser_detect_bruteforce.add_argument("-f", "--follow", action="store_true", help="Watch the (first) log file and report attacks as they happen")
+parser_detect_bruteforce.add_argument("-p", "--poll", type=float, help="How often to check the followed file for new lines, in seconds", default=0.05)
+parser_rate_limits.add_argument("-r", "--rule", type=str, action="append", help="Threshold as COUNT/WINDOW, e.g. 5/10s, 50/10m, 500/1d (repeatable)")
+parser_rate_limits.add_argument("-b", "--by", type=str, nargs="+", choices=["ip", "user", "subnet"], default=["ip", "user", "subnet"], help="What to count failures per")
 
 args = argparser.parse_args()
 # Argparse
@@ -51,17 +62,63 @@ logger.addHandler(h2)
 # Logger
 
 
-LogEntry = TypedDict('LogEntry', {
-    "date": datetime,
-    "machine_name": str,
-    "sshd_pid": int,
-    "details": str
-})
+# Message type, user and IPs of an entry - computed once and kept on the entry
+class Classification(NamedTuple):
+    message_type: str
+    user: str | None
+    ips: list[int]      # packed, see ipv4.py
+
+
+class LogEntry:
+    # parsed line; type, user and IPs are worked out on first use and kept
+    __slots__ = ("date", "machine_name", "sshd_pid", "details", "_classification")
+
+    def __init__(self, date: datetime, machine_name: str, sshd_pid: int, details: str) -> None:
+        self.date = date
+        self.machine_name = machine_name
+        self.sshd_pid = sshd_pid
+        self.details = details
+        self._classification: Classification | None = None
+
+    @property
+    def classification(self) -> Classification:
+        if self._classification is None:
+            self._classification = classify_details(self.details)
+        return self._classification
+
+    @property
+    def message_type(self) -> str:
+        return self.classification.message_type
+
+    @property
+    def user(self) -> str | None:
+        return self.classification.user
+
+    @property
+    def ip_ints(self) -> list[int]:
+        return self.classification.ips
+
+    @property
+    def ips(self) -> list[str]:
+        return [ipv4_to_str(ip) for ip in self.classification.ips]
+
+    def __getitem__(self, key: str) -> Any:
+        # entry["date"] still works like with the old dict entries
+        if key not in ("date", "machine_name", "sshd_pid", "details"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        return repr({
+            "date": self.date,
+            "machine_name": self.machine_name,
+            "sshd_pid": self.sshd_pid,
+            "details": self.details
+        })
 
 
 def parse_line(line: str) -> LogEntry:
-    first_half = line.split("]: ")[0]
-    second_half = line.split("]: ")[1]
+    first_half, _, second_half = line.partition("]: ")
     
     # Get the basic info from the first half
     info = re.search(r"(\w{3}\s*\d{1,2} \d{2}:\d{2}:\d{2}) (\w+) sshd\[(\d+)$", first_half)
@@ -70,42 +127,46 @@ def parse_line(line: str) -> LogEntry:
         machine_name = info.group(2)
         sshd_pid = int(info.group(3))
     else:
-        print(first_half)
-        raise ValueError("Invalid line")
+        raise ValueError(f"Invalid line: {line.rstrip()}")
 
-    return {
-        "date": datetime.strptime(date_str, "%b %d %H:%M:%S"),
-        "machine_name": machine_name,
-        "sshd_pid": sshd_pid,
-        "details": second_half.strip()
-    }
+    return LogEntry(parse_syslog_time(date_str), machine_name, sshd_pid, second_half.strip())
+
+
+MESSAGE_TYPES = {
+    "SessionOpened": r"pam_unix\(sshd:session\): session opened for user \w+",
+    "AuthFailure": r"pam_unix\(sshd:auth\): authentication failure",
+    "WrongPassword": r"Failed password for \w+ from",
+    "SessionClosed": r"pam_unix\(sshd:session\): session closed for user \w+",
+    "WrongUsername": r"Invalid user \w+ from",
+    "PossibleBreakIn": r"failed - POSSIBLE BREAK-IN ATTEMPT!"
+}
+
+# compiled once; one search finds the type, the name of the matched group is the type
+MESSAGE_TYPE_PATTERN = re.compile("|".join(f"(?P<{key}>{pattern})" for key, pattern in MESSAGE_TYPES.items()))
+USER_PATTERN = re.compile(r"user (\w+)|user=(\w+)")
+
+
+def classify_details(details: str) -> Classification:
+    message_type = MESSAGE_TYPE_PATTERN.search(details)
+    user = USER_PATTERN.search(details)
+
+    return Classification(
+        message_type.lastgroup if message_type and message_type.lastgroup else "other",
+        (user.group(1) or user.group(2)) if user else None,
+        find_ipv4s(details)
+    )
 
 
 def get_ipv4s_from_log(entry: LogEntry) -> list[str]:
-    ips = re.findall(r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})", entry["details"])
-    return list(ips) if ips else []
+    return entry.ips
 
 
 def get_user_from_log(entry: LogEntry) -> str | None:
-    user = re.search(r"user (\w+)|user=(\w+)", entry["details"])
-    return (user.group(1) or user.group(2)) if user else None
+    return entry.user
 
 
 def get_message_type(entry: LogEntry) -> str:
-    patterns = {
-        "SessionOpened": r"pam_unix\(sshd:session\): session opened for user (\w+)",
-        "AuthFailure": r"pam_unix\(sshd:auth\): authentication failure",
-        "WrongPassword": r"Failed password for (\w+) from",
-        "SessionClosed": r"pam_unix\(sshd:session\): session closed for user (\w+)",
-        "WrongUsername": r"Invalid user (\w+) from",
-        "PossibleBreakIn": r"failed - POSSIBLE BREAK-IN ATTEMPT!"
-    }
-    
-    for key, pattern in patterns.items():
-        if re.search(pattern, entry["details"]):
-            return key
-    
-    return "other"
+    return entry.message_type
 
 
 def n_logs_for_random_user(logs: list[LogEntry], n: int, users: set[str]) -> list[LogEntry]:
@@ -113,44 +174,49 @@ def n_logs_for_random_user(logs: list[LogEntry], n: int, users: set[str]) -> lis
     user = random.choice(list(users))
     
     # get all logs for that user
-    all = list(filter(lambda x: get_user_from_log(x) == user, logs))
+    all = [log for log in logs if log.user == user]
     
     # return n random logs
     return random.sample(all, n if n <= len(all) else len(all))
 
 
-def session_duration_stats(logs: list[LogEntry]) -> tuple[float, float]:
-    durations: list[float] = []
+def session_duration_stats(logs: Iterable[LogEntry]) -> tuple[float, float]:
+    # running sums instead of a list of durations, so logs can be a stream
+    count = 0
+    total = 0.0
+    total_squares = 0.0
     
     open_date: dict[str, datetime] = {}
     
     for log in logs:
-        user = get_user_from_log(log)
+        user = log.user
         if not user:
             continue
         
-        match get_message_type(log):
+        match log.message_type:
             case "SessionOpened":
-                open_date[user] = log["date"]
+                open_date[user] = log.date
             case "SessionClosed":
                 if user in open_date:
-                    durations.append((log["date"] - open_date[user]).total_seconds())
-                    open_date.pop(user)
+                    duration = (log.date - open_date.pop(user)).total_seconds()
+                    count += 1
+                    total += duration
+                    total_squares += duration * duration
 
-    average = sum(durations) / len(durations) if len(durations) > 0 else 0
-    standard_deviation = (sum([(x - average) ** 2 for x in durations]) / len(durations)) ** 0.5 if len(durations) > 0 else 0
+    average = total / count if count > 0 else 0
+    standard_deviation = max(0.0, (count * total_squares - total * total) / (count * count)) ** 0.5 if count > 0 else 0
     
     return average, standard_deviation
 
 
-def find_most_least_logged_in_user(logs: list[LogEntry]) -> tuple[str, str]:
+def find_most_least_logged_in_user(logs: Iterable[LogEntry]) -> tuple[str, str]:
     users: dict[str, int] = {}
     
     for log in logs:
-        if "session opened" not in log["details"]:
+        if "session opened" not in log.details:
             continue
         
-        user = get_user_from_log(log)
+        user = log.user
         if user:
             if user not in users:
                 users[user] = 0
@@ -162,19 +228,35 @@ def find_most_least_logged_in_user(logs: list[LogEntry]) -> tuple[str, str]:
     return most, least
 
 
-def parse_all(lines: list[str]) -> list[LogEntry]:
-    entries: list[LogEntry] = []
+def open_log(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path, "r")
+
+
+def read_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        with open_log(path) as f:
+            yield from f
+
+
+def iter_parsed(lines: Iterable[str]) -> Iterator[LogEntry]:
+    # without logging there is no need to classify entries here, modes do it on demand
+    log_bytes = logger.isEnabledFor(logging.DEBUG)
+    log_types = logger.isEnabledFor(logging.CRITICAL)
     
     for line in lines:
-        logger.debug(f"Bytes read: {len(line.encode('utf-8'))}")
+        if log_bytes:
+            logger.debug(f"Bytes read: {len(line.encode('utf-8'))}")
         entry = parse_line(line)
-        entries.append(entry)
         
-        ip = get_ipv4s_from_log(entry)
-        user = get_user_from_log(entry)
-        message_type = get_message_type(entry)
+        if not log_types:
+            yield entry
+            continue
+        
+        ip, user = entry.ips, entry.user
         
-        match message_type:
+        match entry.message_type:
             case "SessionOpened":
                 logger.info(f"SessionOpened: (IP: {ip}) (User: {user})")
             case "AuthFailure":
@@ -183,55 +265,65 @@ def parse_all(lines: list[str]) -> list[LogEntry]:
                 logger.error(f"WrongPassword: (IP: {ip}) (User: {user})")
             case "PossibleBreakIn":
                 logger.critical(f"PossibleBreakIn: (IP: {ip}) (User: {user})")
-    
-    return entries
+        
+        yield entry
+
 
+def parse_all(lines: Iterable[str]) -> list[LogEntry]:
+    return list(iter_parsed(lines))
 
-def print_parsed(entries: list[LogEntry]) -> None:
+
+def print_parsed(entries: Iterable[LogEntry]) -> None:
     for entry in entries:
-        ip = get_ipv4s_from_log(entry)
-        user = get_user_from_log(entry)
-        message_type = get_message_type(entry)
+        print(f"(IP: {entry.ips}) (User: {entry.user}) (Message type: {entry.message_type})")
+
+
+def detect_bruteforce(entries: Iterable[LogEntry], max_delay: int, max_attempts: int, user_to_detect: str | None) -> dict[str, int]:
+    tracker = BruteforceTracker(max_delay, max_attempts)
+    # report attackers in the order their IPs first appeared in the log
+    first_seen: dict[int, None] = {}
+    
+    for log in entries:
+        if user_to_detect and log.user != user_to_detect:
+            continue
         
-        print(f"(IP: {ip}) (User: {user}) (Message type: {message_type})")
+        if log.ip_ints:
+            first_seen.setdefault(log.ip_ints[0], None)
+            tracker.update(log)
+    
+    return {ipv4_to_str(ip): tracker.attacks[ip] for ip in first_seen if ip in tracker.attacks}
 
 
-def detect_bruteforce(entries: list[LogEntry], max_delay: int, max_attempts: int, user_to_detect: str | None) -> dict[str, int]:
+RATE_EVENTS = ("AuthFailure", "WrongPassword", "WrongUsername")
+RATE_EPOCH = datetime(1900, 1, 1)
 
-    longest_chains_for_ip: dict[str, int] = {}
-    current_chains_for_ip: dict[str, int] = {}
-    
-    last_time_for_ip: dict[str, datetime] = {}
+
+def detect_rate_limits(entries: Iterable[LogEntry], thresholds: list[Threshold], dimensions: list[str]) -> Iterator[tuple[LogEntry, list[Alert]]]:
+    # ips and subnets are counted as packed ints, text is made only for an alert
+    describe = {"ip": ipv4_to_str, "subnet": subnet_to_str, "user": str}
+    engines = [(dimension, RateEngine(thresholds, dimension, describe[dimension])) for dimension in dimensions]
     
     for log in entries:
-        ip = get_ipv4s_from_log(log)
-        user = get_user_from_log(log)
-        message_type = get_message_type(log)
-        
-        if user_to_detect and user != user_to_detect:
+        if log.message_type not in RATE_EVENTS:
             continue
         
-        if ip:
-            if ip[0] not in longest_chains_for_ip:
-                longest_chains_for_ip[ip[0]] = 0
-                current_chains_for_ip[ip[0]] = 0
-            
-            if message_type == "AuthFailure":
-                if ip[0] not in last_time_for_ip or (log["date"] - last_time_for_ip[ip[0]]).total_seconds() > max_delay:
-                    current_chains_for_ip[ip[0]] = 0
-                
-                last_time_for_ip[ip[0]] = log["date"]
-                current_chains_for_ip[ip[0]] += 1
-                
-                if current_chains_for_ip[ip[0]] > longest_chains_for_ip[ip[0]]:
-                    longest_chains_for_ip[ip[0]] = current_chains_for_ip[ip[0]]
-                    
-    return dict(filter(lambda x: x[1] > max_attempts, longest_chains_for_ip.items()))
+        ip_ints = log.ip_ints
+        time = (log.date - RATE_EPOCH).total_seconds()
+        alerts: list[Alert] = []
+        for dimension, engine in engines:
+            if dimension == "user":
+                if log.user:
+                    alerts += engine.add(log.user, time)
+            elif ip_ints:
+                alerts += engine.add(ip_ints[0] if dimension == "ip" else ip_ints[0] & SUBNET_MASK, time)
+        
+        if alerts:
+            yield log, alerts
 
 
 def main() -> None:
-    f = open(args.file, "r")
-    entries = parse_all(f.readlines())
+    # a stream of entries - every mode except random_user needs only one pass
+    entries = iter_parsed(read_lines(args.file))
     
     match args.mode:
         case "print_parsed":
@@ -240,7 +332,8 @@ def main() -> None:
 
         case "random_user":
             print(">> Print n random logs for a random user")
-            logs = n_logs_for_random_user(entries, args.number, set(y for x in entries if (y := get_user_from_log(x)) is not None))
+            entries = list(entries)
+            logs = n_logs_for_random_user(entries, args.number, set(y for x in entries if (y := x.user) is not None))
             for log in logs:
                 print(log)
 
@@ -248,7 +341,7 @@ def main() -> None:
             if args.user:
                 print(f">> Print session stats for user {args.user}")
                 
-                avg, std = session_duration_stats(list(filter(lambda x: get_user_from_log(x) == args.user, entries)))
+                avg, std = session_duration_stats(x for x in entries if x.user == args.user)
                 
                 print(f"Average: {avg} s")
                 print(f"Standard deviation: {std} s")
@@ -269,13 +362,30 @@ def main() -> None:
             print(f"Most logged in user: {most}")
             print(f"Least logged in user: {least}")
 
+        case "rate_limits":
+            try:
+                thresholds = [Threshold.parse(rule) for rule in args.rule or ["5/10s", "50/10m", "500/1d"]]
+            except ValueError as e:
+                argparser.error(str(e))
+            print(f">> Rate limits - {', '.join(map(str, thresholds))} per {', '.join(args.by)}")
+            for log, alerts in detect_rate_limits(entries, thresholds, args.by):
+                for alert in alerts:
+                    print(f"{log.date.strftime('%b %d %H:%M:%S')} {alert.threshold} exceeded by {alert.dimension} {alert.key} ({alert.count} failures)")
+
+        case "detect_bruteforce" if args.follow:
+            print(f">> Watching {args.file[0]} for bruteforce - Max delay between attempts: {args.max_delay}s, Max attempts: {args.max_attempts}", flush=True)
+            attacks_live = follow_bruteforce(follow_lines(args.file[0], args.poll), parse_line, args.max_delay, args.max_attempts, args.user)
+            try:
+                for ip, attempts in attacks_live:
+                    print(f"Bruteforce attack detected from {ip} ({attempts} attempts)", flush=True)
+            except KeyboardInterrupt:
+                pass
+
         case "detect_bruteforce":
             print(f">> Detect bruteforce - Max delay between attempts: {args.max_delay}s, Max attempts: {args.max_attempts}")
             attacks = detect_bruteforce(entries, max_delay=args.max_delay, max_attempts=args.max_attempts, user_to_detect=args.user)
             for ip, attempts in attacks.items():
                 print(f"Bruteforce attack detected from {ip} ({attempts} attempts)")
-    
-    f.close()
 
 
 if __name__ == "__main__":
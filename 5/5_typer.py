@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import TypedDict
+from functools import lru_cache
+from typing import NamedTuple, TypedDict
 import re
 import logging
 import sys
@@ -8,6 +9,9 @@ import typer
 from rich.console import Console
 from rich.logging import RichHandler
 
+from ipv4 import find_ipv4s, ipv4_to_str
+from timestamps import parse_syslog_time
+
 console = Console()
 app = typer.Typer()
 
@@ -23,6 +27,13 @@ state: dict[str, list] = {
     "entries": []
 }
 
+# Message type, user and IPs of an entry's details, see classify_details
+class Classification(NamedTuple):
+    message_type: str
+    user: str | None
+    ips: tuple[int, ...]        # packed, see ipv4.py
+
+
 LogEntry = TypedDict('LogEntry', {
     "date": datetime,
     "machine_name": str,
@@ -46,38 +57,56 @@ def parse_line(line: str) -> LogEntry:
         raise ValueError("Invalid line")
 
     return {
-        "date": datetime.strptime(date_str, "%b %d %H:%M:%S"),
+        "date": parse_syslog_time(date_str),
         "machine_name": machine_name,
         "sshd_pid": sshd_pid,
         "details": second_half.strip()
     }
 
 
+MESSAGE_TYPES = {
+    "SessionOpened": r"pam_unix\(sshd:session\): session opened for user \w+",
+    "AuthFailure": r"pam_unix\(sshd:auth\): authentication failure",
+    "WrongPassword": r"Failed password for \w+ from",
+    "SessionClosed": r"pam_unix\(sshd:session\): session closed for user \w+",
+    "WrongUsername": r"Invalid user \w+ from",
+    "PossibleBreakIn": r"failed - POSSIBLE BREAK-IN ATTEMPT!"
+}
+
+# compiled once; one search finds the type, the name of the matched group is the type
+MESSAGE_TYPE_PATTERN = re.compile("|".join(f"(?P<{key}>{pattern})" for key, pattern in MESSAGE_TYPES.items()))
+USER_PATTERN = re.compile(r"user (\w+)|user=(\w+)")
+
+
+def classify(entry: LogEntry) -> Classification:
+    return classify_details(entry["details"])
+
+
+# kept out of the entry dicts, so printed entries stay as parsed; the getters are
+# called one after another for the same entry, so a few recent details strings are
+# enough - nearly every line is unique and an unbounded cache would hold the whole log
+@lru_cache(maxsize=256)
+def classify_details(details: str) -> Classification:
+    message_type = MESSAGE_TYPE_PATTERN.search(details)
+    user = USER_PATTERN.search(details)
+
+    return Classification(
+        message_type.lastgroup if message_type and message_type.lastgroup else "other",
+        (user.group(1) or user.group(2)) if user else None,
+        tuple(find_ipv4s(details))
+    )
+
+
 def get_ipv4s_from_log(entry: LogEntry) -> list[str]:
-    ips = re.findall(r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})", entry["details"])
-    return list(ips) if ips else []
+    return [ipv4_to_str(ip) for ip in classify(entry).ips]
 
 
 def get_user_from_log(entry: LogEntry) -> str | None:
-    user = re.search(r"user (\w+)|user=(\w+)", entry["details"])
-    return (user.group(1) or user.group(2)) if user else None
+    return classify(entry).user
 
 
 def get_message_type(entry: LogEntry) -> str:
-    patterns = {
-        "SessionOpened": r"pam_unix\(sshd:session\): session opened for user (\w+)",
-        "AuthFailure": r"pam_unix\(sshd:auth\): authentication failure",
-        "WrongPassword": r"Failed password for (\w+) from",
-        "SessionClosed": r"pam_unix\(sshd:session\): session closed for user (\w+)",
-        "WrongUsername": r"Invalid user (\w+) from",
-        "PossibleBreakIn": r"failed - POSSIBLE BREAK-IN ATTEMPT!"
-    }
-
-    for key, pattern in patterns.items():
-        if re.search(pattern, entry["details"]):
-            return key
-
-    return "other"
+    return classify(entry).message_type
 
 
 def n_logs_for_random_user(logs: list[LogEntry], n: int, users: set[str]) -> list[LogEntry]:
@@ -0,0 +1,94 @@
+# Czas dzialania kazdego trybu 5.py na wygenerowanym, duzym logu
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from rate_windows import SUBNET_MASK, RateEngine, Threshold
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MESSAGES = [
+    "pam_unix(sshd:session): session opened for user {user} by (uid=0)",
+    "pam_unix(sshd:session): session closed for user {user}",
+    "pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}  user={user}",
+    "pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}",
+    "Failed password for {user} from {ip} port 36060 ssh2",
+    "Failed password for invalid user {user} from {ip} port 38926 ssh2",
+    "Invalid user {user} from {ip}",
+    "reverse mapping checking getaddrinfo for ns.example.com [{ip}] failed - POSSIBLE BREAK-IN ATTEMPT!",
+    "Accepted password for {user} from {ip} port 49116 ssh2",
+    "Received disconnect from {ip}: 11: Bye Bye [preauth]",
+    "Connection closed by {ip} [preauth]",
+]
+
+MODES = [
+    ["print_parsed"],
+    ["random_user", "-n", "10"],
+    ["session_duration_stats"],
+    ["most_least_logged_in_user"],
+    ["detect_bruteforce"],
+    ["rate_limits"],
+]
+
+
+def write_sample_log(path: str, n: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    users = ["root", "admin", "fztu", "oracle", "test"] + [f"user{i}" for i in range(500)]
+    ips = [f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}" for _ in range(2000)]
+    second = 0
+    with open(path, "w") as f:
+        for _ in range(n):
+            second += rnd.choice([0, 0, 1, 2])
+            day, rest = divmod(second, 86400)
+            message = rnd.choice(MESSAGES).format(user=rnd.choice(users), ip=rnd.choice(ips))
+            f.write(f"Dec {day % 21 + 10} {rest // 3600:02d}:{rest // 60 % 60:02d}:{rest % 60:02d} "
+                    f"LabSZ sshd[{rnd.randint(20000, 30000)}]: {message}\n")
+
+
+def bench_rate_engine(n: int, seed: int = 0) -> None:
+    # sam RateEngine, bez parsowania linii: klucze ip, podsiec i uzytkownik, progi domyslne
+    rnd = random.Random(seed)
+    ips = [rnd.getrandbits(32) for _ in range(2000)]
+    users = ["root", "admin", "fztu", "oracle", "test"] + [f"user{i}" for i in range(500)]
+    events = []
+    second = 0
+    for _ in range(n):
+        second += rnd.choice([0, 0, 1, 2])
+        events.append((rnd.choice(ips), rnd.choice(users), float(second)))
+
+    thresholds = [Threshold.parse(rule) for rule in ("5/10s", "50/10m", "500/1d")]
+    by_ip, by_subnet, by_user = (RateEngine(thresholds, dimension) for dimension in ("ip", "subnet", "user"))
+    start = time.perf_counter()
+    for ip, user, second in events:
+        by_ip.add(ip, second)
+        by_subnet.add(ip & SUBNET_MASK, second)
+        by_user.add(user, second)
+    print(f"{'RateEngine':30} {n / (time.perf_counter() - start):.0f} zdarzen/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark 5.py modes")
+    parser.add_argument("-n", "--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auth.log")
+        write_sample_log(path, args.lines)
+
+        print(f"linie: {args.lines}")
+        for mode in MODES:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(HERE, "5.py"), path, *mode],
+                           stdout=subprocess.DEVNULL, check=True)
+            print(f"{' '.join(mode):30} {time.perf_counter() - start:.2f} s")
+
+    bench_rate_engine(args.lines)
+
+
+if __name__ == "__main__":
+    main()
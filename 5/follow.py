@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Protocol
+import os
+import time
+
+from ipv4 import ipv4_to_str
+
+
+class AuthEvent(Protocol):
+    # what the tracker needs from a parsed entry (LogEntry in 5.py)
+    date: datetime
+
+    @property
+    def message_type(self) -> str: ...
+
+    @property
+    def user(self) -> str | None: ...
+
+    @property
+    def ip_ints(self) -> list[int]: ...
+
+
+class BruteforceTracker:
+    # incremental version of the AuthFailure chain tracking from detect_bruteforce;
+    # IPs idle for longer than max_delay are forgotten, their next failure starts a new chain anyway
+    def __init__(self, max_delay: int, max_attempts: int) -> None:
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+        # packed ip -> (last failure time, current chain), least recently active first
+        self.active: OrderedDict[int, tuple[datetime, int]] = OrderedDict()
+        # longest chain of every IP that went over max_attempts
+        self.attacks: dict[int, int] = {}
+
+    def update(self, log: AuthEvent) -> int | None:
+        # returns the chain length when this entry makes the chain cross max_attempts
+        if log.message_type != "AuthFailure" or not log.ip_ints:
+            return None
+
+        ip = log.ip_ints[0]
+        self._evict(log.date)
+
+        state = self.active.pop(ip, None)
+        # syslog dates have no year, so after New Year's Eve the gap goes negative - that starts a new chain too
+        if state is None or not 0 <= (log.date - state[0]).total_seconds() <= self.max_delay:
+            chain = 1
+        else:
+            chain = state[1] + 1
+        self.active[ip] = (log.date, chain)
+
+        if chain > self.max_attempts:
+            if chain > self.attacks.get(ip, 0):
+                self.attacks[ip] = chain
+            if chain == self.max_attempts + 1:
+                return chain
+        return None
+
+    def _evict(self, now: datetime) -> None:
+        while self.active:
+            ip, (last_time, _) = next(iter(self.active.items()))
+            if 0 <= (now - last_time).total_seconds() <= self.max_delay:
+                break
+            del self.active[ip]
+
+
+def follow_lines(path: str, poll: float = 0.05, from_start: bool = False) -> Iterator[str]:
+    # like tail -f (4/3.py), but also notices when the file is rotated or truncated
+    f = open(path, "r")
+    if not from_start:
+        f.seek(0, os.SEEK_END)
+
+    buffer = ""
+    try:
+        while True:
+            line = f.readline()
+            if line:
+                buffer += line
+                if buffer.endswith("\n"):
+                    yield buffer
+                    buffer = ""
+                continue
+
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+
+            if stat is not None and (stat.st_ino != os.fstat(f.fileno()).st_ino or stat.st_size < f.tell()):
+                # rotated (new file under the same name) or truncated - read the new file from the start
+                f.close()
+                f = open(path, "r")
+                buffer = ""
+                continue
+
+            time.sleep(poll)
+    finally:
+        f.close()
+
+
+def follow_bruteforce(lines: Iterable[str], parse: Callable[[str], AuthEvent], max_delay: int, max_attempts: int, user_to_detect: str | None) -> Iterator[tuple[str, int]]:
+    tracker = BruteforceTracker(max_delay, max_attempts)
+
+    for line in lines:
+        # a live auth.log also gets lines from CRON, systemd-logind etc. - not ours to count
+        try:
+            log = parse(line)
+        except ValueError:
+            continue
+
+        if user_to_detect and log.user != user_to_detect:
+            continue
+
+        attempts = tracker.update(log)
+        if attempts is not None:
+            yield ipv4_to_str(log.ip_ints[0]), attempts
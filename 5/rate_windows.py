@@ -0,0 +1,154 @@
+from typing import Any, Callable, Iterable, NamedTuple
+import math
+
+from ipv4 import ipv4_to_str
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# the narrowest window is split into this many buckets (wider ones into more); a count
+# can include events from at most one bucket before the window, never fewer
+BUCKETS = 10
+
+
+class Threshold(NamedTuple):
+    limit: int
+    window: int     # seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "Threshold":
+        # "5/10s", "50/10m", "500/1d"
+        limit, _, window = spec.partition("/")
+        unit = window[-1:]
+        if not limit.isdigit() or unit not in UNITS or not window[:-1].isdigit():
+            raise ValueError(f"Invalid threshold: {spec}")
+        return cls(int(limit), int(window[:-1]) * UNITS[unit])
+
+    def __str__(self) -> str:
+        for unit in ("d", "h", "m"):
+            if self.window % UNITS[unit] == 0:
+                return f"{self.limit}/{self.window // UNITS[unit]}{unit}"
+        return f"{self.limit}/{self.window}s"
+
+
+class Alert(NamedTuple):
+    dimension: str
+    key: str
+    threshold: Threshold
+    count: int
+    time: float
+
+
+class KeyWindows:
+    # events of one key in a single ring of buckets shared by every threshold;
+    # ends[j] is the number of events up to and including buckets[j], so a window
+    # starting at bucket j holds `events - ends[j - 1]` of them
+    __slots__ = ("buckets", "ends", "events", "starts", "before", "alerted", "next_check", "next_expiry")
+
+    def __init__(self, thresholds: int, bucket: int) -> None:
+        self.buckets = [bucket]
+        self.ends = [0]
+        self.events = 0
+        # per threshold: where its window starts in the ring, events before that, alert state;
+        # starts only move in RateEngine._update, in between a count can only be overestimated
+        self.starts = [0] * thresholds
+        self.before = [0] * thresholds
+        self.alerted = [False] * thresholds
+        # event count at which a threshold not alerted yet may be reached
+        self.next_check: float = 0
+        # bucket at which an alerted threshold may drop below its limit
+        self.next_expiry: float = math.inf
+
+
+class RateEngine:
+    # counts events per key of one dimension (e.g. packed IPs) against several thresholds at once;
+    # keys are whatever is cheapest to hash, describe() turns one into text only for an alert
+    def __init__(self, thresholds: Iterable[Threshold], dimension: str = "", describe: Callable[[Any], str] = str) -> None:
+        self.thresholds = list(thresholds)
+        self.dimension = dimension
+        self.describe = describe
+        self.max_window = max(threshold.window for threshold in self.thresholds)
+        # buckets are sized for the narrowest window, wider windows just span more of them
+        min_window = min(threshold.window for threshold in self.thresholds)
+        self.bucket_size = min_window / BUCKETS
+        self.spans = [math.ceil(threshold.window * BUCKETS / min_window) for threshold in self.thresholds]
+        # the widest window starts first in the ring, nothing before its start is needed
+        self.widest = self.spans.index(max(self.spans))
+        self.windows: dict[Any, KeyWindows] = {}
+        self.next_sweep = -math.inf
+
+    def add(self, key: Any, time: float) -> list[Alert]:
+        # most events can neither reach a limit nor end an alert, they only extend the ring
+        bucket = int(time // self.bucket_size)
+        if time >= self.next_sweep:
+            self._sweep(time, bucket)
+
+        windows = self.windows.get(key)
+        if windows is None:
+            windows = self.windows[key] = KeyWindows(len(self.thresholds), bucket)
+        events = windows.events = windows.events + 1
+
+        if windows.buckets[-1] == bucket:
+            windows.ends[-1] = events
+        else:
+            windows.buckets.append(bucket)
+            windows.ends.append(events)
+            if bucket >= windows.next_expiry:
+                return self._update(key, windows, bucket, time)
+
+        if events >= windows.next_check:
+            return self._update(key, windows, bucket, time)
+        return []
+
+    def _update(self, key: Any, windows: KeyWindows, bucket: int, time: float) -> list[Alert]:
+        alerts: list[Alert] = []
+        buckets, ends, starts, before, alerted = windows.buckets, windows.ends, windows.starts, windows.before, windows.alerted
+        next_check: float = math.inf
+        next_expiry: float = math.inf
+
+        for i, (threshold, span) in enumerate(zip(self.thresholds, self.spans)):
+            # the window can start anywhere inside the bucket `span` back, keep that one too
+            oldest = bucket - span - 1
+            start = starts[i]
+            if buckets[start] <= oldest:
+                while buckets[start] <= oldest:
+                    start += 1
+                starts[i] = start
+                before[i] = ends[start - 1]
+
+            count = windows.events - before[i]
+            if count >= threshold.limit:
+                if not alerted[i]:
+                    alerted[i] = True
+                    alerts.append(Alert(self.dimension, self.describe(key), threshold, count, time))
+                next_expiry = min(next_expiry, buckets[start] + span + 1)
+            else:
+                alerted[i] = False
+                next_check = min(next_check, before[i] + threshold.limit)
+
+        windows.next_check = next_check
+        windows.next_expiry = next_expiry
+        self._compact(windows)
+        return alerts
+
+    def _compact(self, windows: KeyWindows) -> None:
+        # drop the expired head of the ring once it is at least half of it
+        first = windows.starts[self.widest]
+        if first >= 16 and 2 * first >= len(windows.buckets):
+            del windows.buckets[:first], windows.ends[:first]
+            windows.starts = [start - first for start in windows.starts]
+
+    def _sweep(self, now: float, bucket: int) -> None:
+        # once per widest window, drop keys with nothing left in any window
+        oldest = bucket - self.spans[self.widest] - 1
+        for key in [key for key, windows in self.windows.items() if windows.buckets[-1] <= oldest]:
+            del self.windows[key]
+        self.next_sweep = now + self.max_window
+
+
+SUBNET_PREFIX = 24
+SUBNET_MASK = (0xFFFFFFFF << (32 - SUBNET_PREFIX)) & 0xFFFFFFFF
+
+
+def subnet_to_str(network: int) -> str:
+    # packed ip & SUBNET_MASK -> "a.b.c.0/24"
+    return f"{ipv4_to_str(network)}/{SUBNET_PREFIX}"
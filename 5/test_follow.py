@@ -0,0 +1,102 @@
+import os
+import threading
+from datetime import datetime
+from typing import NamedTuple
+
+from follow import BruteforceTracker, follow_bruteforce, follow_lines
+from ipv4 import find_ipv4s
+
+
+class Entry(NamedTuple):
+    date: datetime
+    message_type: str
+    user: str | None
+    ip_ints: list[int]
+
+
+def parse(line: str) -> Entry:
+    # just enough of 5.py parse_line for the tracker
+    if " sshd[" not in line:
+        raise ValueError(f"Invalid line: {line.rstrip()}")
+    date = datetime.strptime(line[:15], "%b %d %H:%M:%S")
+    message_type = "AuthFailure" if "authentication failure" in line else "Other"
+    return Entry(date, message_type, None, list(find_ipv4s(line)))
+
+
+def failure(second: int, ip: str = "183.62.140.253") -> str:
+    return f"Dec 10 06:55:{second:02d} LabSZ sshd[24200]: pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}\n"
+
+
+def append(path, text: str) -> None:
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def test_tracker_alerts_once_per_chain():
+    tracker = BruteforceTracker(max_delay=5, max_attempts=3)
+
+    results = [tracker.update(parse(failure(second))) for second in (0, 1, 2, 3, 4)]
+
+    assert results == [None, None, None, 4, None]
+    assert list(tracker.attacks.values()) == [5]
+
+
+def test_tracker_chain_broken_by_delay():
+    tracker = BruteforceTracker(max_delay=5, max_attempts=2)
+
+    results = [tracker.update(parse(failure(second))) for second in (0, 1, 10, 11, 12)]
+
+    assert results == [None, None, None, None, 3]
+
+
+def test_tracker_year_rollover():
+    tracker = BruteforceTracker(max_delay=5, max_attempts=2)
+    rollover = [
+        "Dec 31 23:59:58" + failure(0)[15:],
+        "Dec 31 23:59:59" + failure(0)[15:],
+        "Jan 01 09:00:00" + failure(0)[15:],
+        "Jan 01 09:00:01" + failure(1, "1.2.3.4")[15:],
+    ]
+
+    results = [tracker.update(parse(line)) for line in rollover]
+
+    assert results == [None, None, None, None]
+    # the December chain is gone, only the January failures are tracked
+    assert [chain for _, chain in tracker.active.values()] == [1, 1]
+
+
+def test_follow_bruteforce_alert(tmp_path):
+    path = tmp_path / "auth.log"
+    append(path, "Dec 10 06:55:00 LabSZ CRON[1234]: pam_unix(cron:session): session opened for user root by (uid=0)\n")
+    append(path, "".join(failure(second) for second in range(4)))
+
+    attacks = follow_bruteforce(follow_lines(str(path), poll=0.01, from_start=True), parse, 5, 3, None)
+
+    assert next(attacks) == ("183.62.140.253", 4)
+
+
+def test_follow_lines_waits_for_partial_line(tmp_path):
+    path = tmp_path / "auth.log"
+    line = failure(0)
+    append(path, line[:20])
+    lines = follow_lines(str(path), poll=0.01, from_start=True)
+
+    # the rest of the line arrives while follow_lines is polling
+    timer = threading.Timer(0.1, append, (path, line[20:]))
+    timer.start()
+    try:
+        assert next(lines) == line
+    finally:
+        timer.join()
+
+
+def test_follow_lines_after_rotation(tmp_path):
+    path = tmp_path / "auth.log"
+    append(path, failure(0))
+    lines = follow_lines(str(path), poll=0.01, from_start=True)
+    assert next(lines) == failure(0)
+
+    os.rename(path, tmp_path / "auth.log.1")
+    append(path, failure(1, "1.2.3.4"))
+
+    assert next(lines) == failure(1, "1.2.3.4")
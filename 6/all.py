@@ -3,6 +3,10 @@ from datetime import datetime
 from ipaddress import IPv4Address
 import re
 
+from ipv4 import first_ipv4
+
+_NOT_SCANNED = -1
+
 
 class SSHLogEntry(ABC):
     def __init__(self, time, raw_content, pid, host):
@@ -10,6 +14,7 @@ class SSHLogEntry(ABC):
         self.pid = pid
         self.host = host
         self._raw_content = raw_content
+        self._ip = _NOT_SCANNED
 
     def __str__(self):
         return f"Type: {self.type()} Time: {self.time}, Host: {self.host}, PID: {self.pid}, Raw Content: {self._raw_content}"
@@ -21,17 +26,20 @@ class SSHLogEntry(ABC):
     def type(self):
         return self.__class__.__name__
 
+    @property
+    def ip_int(self):
+        # first valid IPv4 in the content as a 32-bit int, scanned once
+        if self._ip == _NOT_SCANNED:
+            self._ip = first_ipv4(self._raw_content)
+        return self._ip
+
     @property
     def has_ip(self):
-        return self._extract_ip() is not None
+        return self.ip_int is not None
 
     def _extract_ip(self):
-        ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-        ip_matched = re.search(ip_pattern, self._raw_content)
-        if ip_matched:
-            return IPv4Address(ip_matched.group())
-        else:
-            return None
+        ip = self.ip_int
+        return IPv4Address(ip) if ip is not None else None
 
     def __repr__(self):
         return f"{self.type()} >> time = {self.time}, host = {self.host}, pid = {self.pid}, raw_content = {self._raw_content}"
@@ -42,6 +50,9 @@ class SSHLogEntry(ABC):
                 and self._raw_content == other._raw_content
                 and self.pid == other.pid)
 
+    def __hash__(self):
+        return hash((self.time, self.pid, self._raw_content))
+
     def __lt__(self, other):
         return self.time < other.time
 
@@ -80,8 +91,12 @@ class OtherInfo(SSHLogEntry):
         return True
 
 class SSHLogJournal:
-    def __init__(self):
+    def __init__(self, dedup=False):
         self._log_entries = []
+        # the same entries as a set, for O(1) membership checks
+        self._entry_set = set()
+        # skip entries already in the journal, e.g. when a log is replayed
+        self._dedup = dedup
 
     def __len__(self):
         return len(self._log_entries)
@@ -90,7 +105,7 @@ class SSHLogJournal:
         return iter(self._log_entries)
 
     def __contains__(self, item):
-        return item in self._log_entries
+        return item in self._entry_set
 
     def parse_log(self, log):
         parts = log.split(" ")
@@ -113,6 +128,9 @@ class SSHLogJournal:
         entry = self.parse_log(log)
 
         if entry.validate():
+            if self._dedup and entry in self._entry_set:
+                return
+            self._entry_set.add(entry)
             self._log_entries.append(entry)
         else:
             print("Invalid log entry:", log)
@@ -149,7 +167,8 @@ class SSHLogJournal:
         elif isinstance(search, int):
             return self._log_entries[search]
         elif isinstance(search, IPv4Address):
-            return [entry for entry in self._log_entries if entry.has_ip and entry._extract_ip() == search]
+            ip = int(search)
+            return [entry for entry in self._log_entries if entry.ip_int == ip]
         elif isinstance(search, str):
             return [entry for entry in self._log_entries if search in entry.time]
         else:
@@ -0,0 +1 @@
+../../common/ipv4.py
\ No newline at end of file
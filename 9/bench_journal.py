@@ -0,0 +1,156 @@
+# Pomiary SSHLogJournal na wygenerowanym logu
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from l6 import LazySSHLogJournal, SSHLogJournal, SSHLogSnapshot
+
+MESSAGES: List[str] = [
+    "pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}  user={user}",
+    "Failed password for {user} from {ip} port 36060 ssh2",
+    "Failed password for invalid user {user} from {ip} port 38926 ssh2",
+    "Invalid user {user} from {ip}",
+    "reverse mapping checking getaddrinfo for ns.example.com [{ip}] failed - POSSIBLE BREAK-IN ATTEMPT!",
+    "Accepted password for {user} from {ip} port 49116 ssh2",
+    "Received disconnect from {ip}: 11: Bye Bye [preauth]",
+    "error: Received disconnect from {ip}: 14: No more user authentication methods available. [preauth]",
+    "Connection closed by {ip} [preauth]",
+]
+
+STRING_QUERIES: List[str] = ["Accepted password", "POSSIBLE BREAK-IN", "user42 ", "Bye Bye", "No more user"]
+TERM_QUERIES: List[List[str]] = [["invalid", "user42"], ["accepted", "root"], ["preauth", "error"]]
+
+
+def write_sample_log(path: str, n: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    users = ["root", "admin", "fztu", "oracle", "test"] + [f"user{i}" for i in range(500)]
+    ips = [f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}" for _ in range(2000)]
+    second = 0
+    with open(path, "w") as f:
+        for _ in range(n):
+            second += rnd.choice([0, 0, 1, 2])
+            day, rest = divmod(second, 86400)
+            message = rnd.choice(MESSAGES).format(user=rnd.choice(users), ip=rnd.choice(ips))
+            f.write(f"Dec {day % 21 + 10} {rest // 3600:02d}:{rest // 60 % 60:02d}:{rest % 60:02d} "
+                    f"LabSZ sshd[{rnd.randint(20000, 30000)}]: {message}\n")
+
+
+def load_journal(path: str, **options: bool) -> SSHLogJournal:
+    journal = SSHLogJournal(**options)
+    with open(path) as f:
+        for line in f:
+            journal.append(line)
+    return journal
+
+
+def timed(label: str, action: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    print(f"{label:40} {elapsed:.3f} s")
+    return elapsed
+
+
+def bench_text_index(path: str) -> None:
+    journals: Dict[str, SSHLogJournal] = {}
+    for label, index_text in (("bez indeksu", False), ("z indeksem", True)):
+        timed(f"wczytanie ({label})", lambda: journals.setdefault(label, load_journal(path, index_text=index_text)))
+
+    for label, journal in journals.items():
+        timed(f"get_logs_by_string x{len(STRING_QUERIES)} ({label})",
+              lambda: [journal.get_logs_by_string(query) for query in STRING_QUERIES])
+        timed(f"get_logs_by_terms x{len(TERM_QUERIES)} ({label})",
+              lambda: [journal.get_logs_by_terms(terms) for terms in TERM_QUERIES])
+
+
+def bench_memory(path: str) -> None:
+    for label, options in (("same wpisy", {"index_ips": False}), ("z indeksem ip", {}),
+                           ("z indeksem tekstu", {"index_text": True})):
+        tracemalloc.start()
+        journal = load_journal(path, **options)
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:40} {used / len(journal):.0f} B/wpis")
+
+
+def bench_lazy(path: str) -> None:
+    for label, load in (("SSHLogJournal", lambda: load_journal(path, index_ips=False)),
+                        ("LazySSHLogJournal", lambda: LazySSHLogJournal(path))):
+        start = time.perf_counter()
+        journal = load()
+        elapsed = time.perf_counter() - start
+        del journal
+        # osobne wczytanie, tracemalloc mocno spowalnia pomiar czasu
+        tracemalloc.start()
+        journal = load()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"wczytanie {label:30} {elapsed:.3f} s {used / 2**20:8.1f} MiB")
+
+        rnd = random.Random(0)
+        positions = [rnd.randrange(len(journal)) for _ in range(10_000)]
+        timed(f"10000 losowych wpisow ({label})", lambda: [journal[position] for position in positions])
+
+
+def bench_bulk(path: str) -> None:
+    for label, options in (("z indeksem ip", {}), ("bez indeksow", {"index_ips": False})):
+        timed(f"append w petli ({label})", lambda: load_journal(path, **options))
+        timed(f"load_file ({label})", lambda: SSHLogJournal(**options).load_file(path))
+
+
+def bench_parallel(path: str) -> None:
+    timed("load_file", lambda: SSHLogJournal().load_file(path))
+    cores = os.cpu_count() or 1
+    for processes in sorted({1, 2, 4, 8, 16, cores}):
+        if processes <= cores:
+            timed(f"load_file_parallel, procesy: {processes}",
+                  lambda: SSHLogJournal().load_file_parallel(path, processes))
+
+
+def bench_snapshot(path: str) -> None:
+    journal = SSHLogJournal()
+    timed("load_file", lambda: journal.load_file(path))
+    snapshot_path = path + ".snap"
+    timed("save", lambda: journal.save(snapshot_path))
+    print(f"{'rozmiar logu / migawki':40} {os.path.getsize(path) / 2**20:.1f} / {os.path.getsize(snapshot_path) / 2**20:.1f} MiB")
+    timed("SSHLogJournal.load", lambda: SSHLogJournal.load(snapshot_path))
+    timed("SSHLogSnapshot + 10000 losowych wpisow", lambda: _sample_snapshot(snapshot_path))
+
+
+def _sample_snapshot(path: str) -> None:
+    with SSHLogSnapshot(path) as snapshot:
+        rnd = random.Random(0)
+        for _ in range(10_000):
+            snapshot[rnd.randrange(len(snapshot))]
+
+
+BENCHMARKS: Dict[str, Callable[[str], None]] = {
+    "text_index": bench_text_index,
+    "memory": bench_memory,
+    "lazy": bench_lazy,
+    "bulk": bench_bulk,
+    "parallel": bench_parallel,
+    "snapshot": bench_snapshot,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SSHLogJournal")
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("-n", "--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auth.log")
+        write_sample_log(path, args.lines)
+        print(f"linie: {args.lines}")
+        BENCHMARKS[args.benchmark](path)
+
+
+if __name__ == "__main__":
+    main()
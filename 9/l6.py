@@ -1,16 +1,85 @@
-import ipaddress
 from abc import ABC, abstractmethod
-from datetime import datetime
-from ipaddress import IPv4Address
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from enum import IntEnum
+from functools import lru_cache
+import gc
+import heapq
+import io
+from ipaddress import IPv4Address, IPv4Network
+from itertools import accumulate, pairwise, repeat
+import mmap
+from multiprocessing import Pool
+from operator import add, le
+import os
 import re
-from typing import List, Union, Optional, Iterator, overload
+import struct
+import sys
+from typing import Any, BinaryIO, Callable, ClassVar, Dict, Iterable, List, Literal, NamedTuple, Sequence, Set, Tuple, Type, Union, Optional, Iterator, overload
+
+from ipv4 import IPV4_CANDIDATE, first_ipv4
+
+_NOT_SCANNED: int = -1
+
+# words, numbers and dotted names such as ip addresses, matched on lowercase content
+_TOKEN_PATTERN: re.Pattern[str] = re.compile(r"\w(?:[\w.@-]*\w)?")
+_NGRAM: int = 3
+
+def tokenize(content: str) -> Set[str]:
+    return set(_TOKEN_PATTERN.findall(content.lower()))
+
+def trigrams(content: str) -> Set[str]:
+    return {content[i:i + _NGRAM] for i in range(len(content) - _NGRAM + 1)}
+
+def _add_posting(index: Dict[str, 'array[int]'], keys: Iterable[str], position: int) -> None:
+    for key in keys:
+        positions: Optional['array[int]'] = index.get(key)
+        if positions is None:
+            index[key] = array("I", (position,))
+        else:
+            positions.append(position)
+
+def _parse_pid(process: str) -> Optional[int]:
+    # "sshd[24200]:" -> 24200
+    start: int = process.find("[")
+    end: int = process.find("]", start)
+    if start == -1 or end == -1:
+        return None
+    return int(process[start + 1:end])
+
+def _cut_postings(index: Dict[str, 'array[int]'], keys: Iterable[str], start: int) -> None:
+    for key in keys:
+        positions: 'array[int]' = index[key]
+        del positions[bisect_left(positions, start):]
+        if not positions:
+            del index[key]
+
+# prefixes of the journal time format that can be answered with a time range
+_TIME_PREFIXES: Tuple[Tuple[str, timedelta], ...] = (
+    ("%b %d %H:%M:%S", timedelta(seconds=1)),
+    ("%b %d %H:%M", timedelta(minutes=1)),
+    ("%b %d %H", timedelta(hours=1)),
+    ("%b %d", timedelta(days=1)),
+)
+
+class EntryType(IntEnum):
+    PASSWORD_REJECTED = 0
+    PASSWORD_ACCEPTED = 1
+    ERROR = 2
+    OTHER_INFO = 3
 
 class SSHLogEntry(ABC):
-    def __init__(self, time: datetime, raw_content: str, pid: str, host: str) -> None:
+    # no per-instance __dict__, a journal holds millions of these
+    __slots__ = ("time", "pid", "host", "_raw_content", "_ip")
+    tag: ClassVar[EntryType]
+
+    def __init__(self, time: datetime, raw_content: str, pid: Optional[int], host: str) -> None:
         self.time: datetime = time
-        self.pid: str = pid
+        self.pid: Optional[int] = pid
         self.host: str = host
         self._raw_content: str = raw_content
+        self._ip: Optional[int] = _NOT_SCANNED
 
     def __str__(self) -> str:
         return f"Type: {self.type()} Time: {self.time}, Host: {self.host}, PID: {self.pid}, Raw Content: {self._raw_content}"
@@ -22,20 +91,20 @@ class SSHLogEntry(ABC):
     def type(self) -> str:
         return self.__class__.__name__
 
+    @property
+    def ip_int(self) -> Optional[int]:
+        # first valid IPv4 in the content as a 32-bit int, scanned once
+        if self._ip == _NOT_SCANNED:
+            self._ip = first_ipv4(self._raw_content)
+        return self._ip
+
     @property
     def has_ip(self) -> bool:
-        return self._extract_ip() is not None
+        return self.ip_int is not None
 
     def _extract_ip(self) -> Optional[IPv4Address]:
-        ip_pattern: str = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-        ip_matched: Optional[re.Match[str]] = re.search(ip_pattern, self._raw_content)
-        if ip_matched:
-            try:
-                return IPv4Address(ip_matched.group())
-            except ipaddress.AddressValueError:
-                return None
-        else:
-            return None
+        ip: Optional[int] = self.ip_int
+        return IPv4Address(ip) if ip is not None else None
 
     def __repr__(self) -> str:
         return f"{self.type()} >> time = {self.time}, host = {self.host}, pid = {self.pid}, raw_content = {self._raw_content}"
@@ -46,6 +115,9 @@ class SSHLogEntry(ABC):
                 and self._raw_content == other._raw_content
                 and self.pid == other.pid)
 
+    def __hash__(self) -> int:
+        return hash((self.time, self.pid, self._raw_content))
+
     def __lt__(self, other: 'SSHLogEntry') -> bool:
         return self.time < other.time
 
@@ -53,76 +125,661 @@ class SSHLogEntry(ABC):
         return self.time > other.time
 
 class PasswordRejected(SSHLogEntry):
-    def __init__(self, time: datetime, raw_content: str, pid: str, host: str) -> None:
+    __slots__ = ()
+    tag = EntryType.PASSWORD_REJECTED
+
+    def __init__(self, time: datetime, raw_content: str, pid: Optional[int], host: str) -> None:
         super().__init__(time, raw_content, pid, host)
 
     def validate(self) -> bool:
         return "failed password" in self._raw_content.lower()
 
 class PasswordAccepted(SSHLogEntry):
-    def __init__(self, time: datetime, raw_content: str, pid: str, host: str) -> None:
+    __slots__ = ()
+    tag = EntryType.PASSWORD_ACCEPTED
+
+    def __init__(self, time: datetime, raw_content: str, pid: Optional[int], host: str) -> None:
         super().__init__(time, raw_content, pid, host)
 
     def validate(self) -> bool:
         return "accepted password" in self._raw_content.lower()
 
 class Error(SSHLogEntry):
-    def __init__(self, time: datetime, raw_content: str, pid: str, host: str) -> None:
+    __slots__ = ()
+    tag = EntryType.ERROR
+
+    def __init__(self, time: datetime, raw_content: str, pid: Optional[int], host: str) -> None:
         super().__init__(time, raw_content, pid, host)
 
     def validate(self) -> bool:
         return "error" in self._raw_content.lower()
 
 class OtherInfo(SSHLogEntry):
-    def __init__(self, time: datetime, raw_content: str, pid: str, host: str) -> None:
+    __slots__ = ()
+    tag = EntryType.OTHER_INFO
+
+    def __init__(self, time: datetime, raw_content: str, pid: Optional[int], host: str) -> None:
         super().__init__(time, raw_content, pid, host)
 
     def validate(self) -> bool:
         return True
 
+# entry classes by EntryType value
+_ENTRY_CLASSES: Tuple[Type[SSHLogEntry], ...] = (PasswordRejected, PasswordAccepted, Error, OtherInfo)
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_MICROSECOND: timedelta = timedelta(microseconds=1)
+_NO_PID: int = -1
+_NO_IP: int = -2
+
+class JournalColumns(NamedTuple):
+    """Journal entries as flat columns, cheap to pickle and to write out."""
+    tags: Sequence[int]
+    times: Sequence[int]      # microseconds since 1970-01-01
+    pids: Sequence[int]       # _NO_PID when the line had none
+    host_ids: Sequence[int]   # positions in hosts
+    hosts: List[str]
+    ips: Sequence[int]        # address as int, _NO_IP, or _NOT_SCANNED
+    contents: Sequence[str]
+
+    @classmethod
+    def from_entries(cls, entries: Sequence[SSHLogEntry]) -> 'JournalColumns':
+        host_ids: Dict[str, int] = {}
+        return cls(
+            bytes(entry.tag for entry in entries),
+            array("q", [(entry.time - _EPOCH) // _MICROSECOND for entry in entries]),
+            array("q", [_NO_PID if entry.pid is None else entry.pid for entry in entries]),
+            array("I", [host_ids.setdefault(entry.host, len(host_ids)) for entry in entries]),
+            list(host_ids),
+            array("q", [_NO_IP if entry._ip is None else entry._ip for entry in entries]),
+            [entry._raw_content for entry in entries],
+        )
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def entry(self, position: int) -> SSHLogEntry:
+        pid: int = self.pids[position]
+        ip: int = self.ips[position]
+        entry: SSHLogEntry = _ENTRY_CLASSES[self.tags[position]](
+            _EPOCH + self.times[position] * _MICROSECOND, self.contents[position],
+            None if pid == _NO_PID else pid, sys.intern(self.hosts[self.host_ids[position]]))
+        entry._ip = None if ip == _NO_IP else ip
+        return entry
+
+    def entries(self) -> List[SSHLogEntry]:
+        hosts: List[str] = [sys.intern(host) for host in self.hosts]
+        entries: List[SSHLogEntry] = []
+        last_micros: int = -1
+        time: datetime = _EPOCH
+        for tag, micros, pid, host_id, ip, content in zip(self.tags, self.times, self.pids, self.host_ids,
+                                                         self.ips, self.contents):
+            if micros != last_micros:
+                # entries from the same second share one datetime, as after parsing
+                time = _EPOCH + micros * _MICROSECOND
+                last_micros = micros
+            entry: SSHLogEntry = _ENTRY_CLASSES[tag](time, content, None if pid == _NO_PID else pid, hosts[host_id])
+            entry._ip = None if ip == _NO_IP else ip
+            entries.append(entry)
+        return entries
+
+class _StringTable(Sequence[str]):
+    """Strings kept as one utf-8 heap and their end offsets, decoded on access."""
+
+    def __init__(self, offsets: Sequence[int], heap: Union[bytes, memoryview]) -> None:
+        self._offsets: Sequence[int] = offsets
+        self._heap: Union[bytes, memoryview] = heap
+
+    @staticmethod
+    def pack(strings: Iterable[str]) -> Tuple['array[int]', bytes]:
+        encoded: List[bytes] = [string.encode("utf-8", "surrogatepass") for string in strings]
+        return array("Q", accumulate(map(len, encoded), initial=0)), b"".join(encoded)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        # one copy of the heap, then plain bytes slices, instead of a view per string
+        heap: bytes = bytes(self._heap)
+        return (heap[start:end].decode("utf-8", "surrogatepass") for start, end in pairwise(self._offsets))
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self))[index]]
+        position: int = range(len(self))[index]
+        return str(self._heap[self._offsets[position]:self._offsets[position + 1]], "utf-8", "surrogatepass")
+
+# snapshot file: header, then one block of little-endian columns per save, every section 8-byte aligned
+SNAPSHOT_MAGIC: bytes = b"SSHJRNL\0"
+SNAPSHOT_VERSION: int = 1
+_SNAPSHOT_HEADER: struct.Struct = struct.Struct("<8sH6x")   # magic, version
+_BLOCK_HEADER: struct.Struct = struct.Struct("<4Q")         # entries, hosts, host heap size, content heap size
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+def _section_sizes(count: int, host_count: int, hosts_size: int, contents_size: int) -> Tuple[int, ...]:
+    # times, pids, ips, content offsets, host offsets, host ids, tags, host heap, content heap
+    return (8 * count, 8 * count, 8 * count, 8 * (count + 1), 8 * (host_count + 1), 4 * count, count,
+            hosts_size, contents_size)
+
+def _little_endian(column: 'array[int]') -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def _ints(section: memoryview, typecode: Literal["q", "Q", "I"]) -> Sequence[int]:
+    # zero-copy view of a mapped section, a swapped copy on big-endian machines
+    if sys.byteorder == "big":
+        column: 'array[int]' = array(typecode, section.tobytes())
+        column.byteswap()
+        return column
+    return section.cast(typecode)
+
+def _write_block(file: BinaryIO, columns: JournalColumns) -> None:
+    host_offsets, host_heap = _StringTable.pack(columns.hosts)
+    content_offsets, content_heap = _StringTable.pack(columns.contents)
+    file.write(_BLOCK_HEADER.pack(len(columns), len(columns.hosts), len(host_heap), len(content_heap)))
+    sections: Tuple[bytes, ...] = (
+        _little_endian(array("q", columns.times)), _little_endian(array("q", columns.pids)),
+        _little_endian(array("q", columns.ips)), _little_endian(content_offsets), _little_endian(host_offsets),
+        _little_endian(array("I", columns.host_ids)), bytes(columns.tags), host_heap, content_heap,
+    )
+    for section in sections:
+        file.write(section)
+        file.write(bytes(_padding(len(section))))
+
+def _snapshot_blocks(buffer: memoryview) -> Iterator[Tuple[int, int]]:
+    # (start, end) of every complete block; a block running past the end of the
+    # file is an append that never finished and is left out
+    if len(buffer) < _SNAPSHOT_HEADER.size:
+        raise ValueError("Not an SSH journal snapshot")
+    magic, version = _SNAPSHOT_HEADER.unpack_from(buffer, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not an SSH journal snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    start: int = _SNAPSHOT_HEADER.size
+    while start + _BLOCK_HEADER.size <= len(buffer):
+        sizes: Tuple[int, ...] = _section_sizes(*_BLOCK_HEADER.unpack_from(buffer, start))
+        end: int = start + _BLOCK_HEADER.size + sum(size + _padding(size) for size in sizes)
+        if end > len(buffer):
+            return
+        yield start, end
+        start = end
+
+def _snapshot_end(file: BinaryIO) -> int:
+    if os.fstat(file.fileno()).st_size < _SNAPSHOT_HEADER.size:
+        raise ValueError("Not an SSH journal snapshot")
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer: memoryview = memoryview(mapped)
+        try:
+            end: int = _SNAPSHOT_HEADER.size
+            for _, end in _snapshot_blocks(buffer):
+                pass
+        finally:
+            buffer.release()
+    return end
+
+def _read_block(buffer: memoryview, start: int) -> JournalColumns:
+    sizes: Tuple[int, ...] = _section_sizes(*_BLOCK_HEADER.unpack_from(buffer, start))
+    sections: List[memoryview] = []
+    offset: int = start + _BLOCK_HEADER.size
+    for size in sizes:
+        sections.append(buffer[offset:offset + size])
+        offset += size + _padding(size)
+    times, pids, ips, content_offsets, host_offsets, host_ids, tags, host_heap, content_heap = sections
+    return JournalColumns(
+        tags, _ints(times, "q"), _ints(pids, "q"), _ints(host_ids, "I"),
+        list(_StringTable(_ints(host_offsets, "Q"), host_heap)), _ints(ips, "q"),
+        _StringTable(_ints(content_offsets, "Q"), content_heap),
+    )
+
+# the layout parse_log splits out: "Dec 10 06:55:48 LabSZ sshd[24200]: content";
+# lines that do not fit go through parse_log itself
+_LINE_HEAD: str = r"((\S+) {1,2}(\S+) (\d+):(\d+):(\d+)) (\S+) [^ \[]*\[(\d+)\]\S* "
+_LINE_PATTERN: re.Pattern[str] = re.compile(_LINE_HEAD + r"(.*)", re.DOTALL)
+# the same, with the first IPv4 candidate of the content found by a lookahead in the same
+# match (see IPV4_CANDIDATE; when it is invalid, first_ipv4 goes on to the next candidates).
+# Candidates start after a non-digit, so only those positions are tried
+_LINE_IP_PATTERN: re.Pattern[str] = re.compile(
+    _LINE_HEAD + rf"(?=(?:\D*(?:\d+\D+)*?{IPV4_CANDIDATE.pattern})?)(.*)", re.DOTALL)
+
+def _entry_class(raw_content: str) -> Type[SSHLogEntry]:
+    # one lower() per line; the checks keep the priority of the validate() methods,
+    # so an entry of the returned class always validates
+    content: str = raw_content.lower()
+    if "failed password" in content:
+        return PasswordRejected
+    elif "accepted password" in content:
+        return PasswordAccepted
+    elif "error" in content:
+        return Error
+    return OtherInfo
+
+def _entry_time(entry: SSHLogEntry) -> datetime:
+    return entry.time
+
+class SSHLogView(Sequence[SSHLogEntry]):
+    """Read-only window over a range of journal entries, nothing is copied."""
+
+    def __init__(self, entries: Sequence[SSHLogEntry], positions: range) -> None:
+        self._entries: Sequence[SSHLogEntry] = entries
+        self._positions: range = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[SSHLogEntry]:
+        return map(self._entries.__getitem__, self._positions)
+
+    @overload
+    def __getitem__(self, index: int) -> SSHLogEntry: ...
+    @overload
+    def __getitem__(self, index: slice) -> 'SSHLogView': ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SSHLogEntry, 'SSHLogView']:
+        if isinstance(index, slice):
+            return SSHLogView(self._entries, self._positions[index])
+        return self._entries[self._positions[index]]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
 class SSHLogJournal:
-    def __init__(self) -> None:
+    def __init__(self, index_ips: bool = True, index_text: bool = False, dedup: bool = False) -> None:
         self._log_entries: List[SSHLogEntry] = []
+        # the same entries as a set for O(1) membership checks, built on the first lookup
+        self._entry_set: Optional[Set[SSHLogEntry]] = None
+        # skip entries already in the journal, e.g. when a log is replayed
+        self._dedup: bool = dedup
+        # consecutive lines often share a second, parse it once and share the datetime
+        self._last_time_str: str = ""
+        self._last_time: datetime = datetime.min
+        # "Dec 10" -> midnight of that day, strptime runs once per day
+        self._dates: Dict[str, datetime] = {}
+        # time of every entry in _log_entries, kept sorted for bisect
+        self._times: List[datetime] = []
+        # entries older than the newest one, merged in before the next read
+        self._pending: List[SSHLogEntry] = []
+        # ip (as int) -> positions of entries with that ip, in append order
+        self._ip_index: Optional[Dict[int, List[int]]] = {} if index_ips else None
+        # sorted distinct ips from _ip_index, for CIDR range queries
+        self._ip_keys: List[int] = []
+        # token / trigram -> positions of entries containing it, in append order
+        self._token_index: Optional[Dict[str, 'array[int]']] = {} if index_text else None
+        self._trigram_index: Optional[Dict[str, 'array[int]']] = {} if index_text else None
 
     def __len__(self) -> int:
-        return len(self._log_entries)
+        return len(self._log_entries) + len(self._pending)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # entries travel as columns, e.g. partial journals sent back by worker processes
+        self._merge()
+        state: Dict[str, Any] = self.__dict__.copy()
+        state["_log_entries"] = JournalColumns.from_entries(self._log_entries)
+        del state["_times"]
+        state["_entry_set"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._log_entries = state["_log_entries"].entries()
+        self._times = [entry.time for entry in self._log_entries]
 
     def __iter__(self) -> Iterator[SSHLogEntry]:
+        self._merge()
         return iter(self._log_entries)
 
     def __contains__(self, item: SSHLogEntry) -> bool:
-        return item in self._log_entries
+        return item in self._members()
+
+    def _members(self) -> Set[SSHLogEntry]:
+        if self._entry_set is None:
+            self._entry_set = set(self._log_entries)
+            self._entry_set.update(self._pending)
+        return self._entry_set
 
     def parse_log(self, log: str) -> SSHLogEntry:
-        parts: List[str] = log.split(" ")
+        parts: List[str] = log.rstrip("\r\n").split(" ")
         if parts[1] == "":
             parts.pop(1)
         time_str: str = " ".join(parts[:3])
-        host: str = parts[3]
-        pid: str = parts[4][1:-1]
+        host: str = sys.intern(parts[3])
+        pid: Optional[int] = _parse_pid(parts[4])
         raw_content: str = " ".join(parts[5:])
-        time: datetime = datetime.strptime(f"{time_str} {datetime.now().year}", "%b %d %H:%M:%S %Y")
-
-        if "failed password" in raw_content.lower():
-            entry: SSHLogEntry = PasswordRejected(time, raw_content, pid, host)
-        elif "accepted password" in raw_content.lower():
-            entry = PasswordAccepted(time, raw_content, pid, host)
-        elif "error" in raw_content.lower():
-            entry = Error(time, raw_content, pid, host)
-        else:
-            entry = OtherInfo(time, raw_content, pid, host)
+        if time_str != self._last_time_str:
+            self._last_time = self._parse_time(time_str)
+            self._last_time_str = time_str
+        return _entry_class(raw_content)(self._last_time, raw_content, pid, host)
 
-        return entry
+    def _parse_time(self, time_str: str) -> datetime:
+        # same result as strptime(f"{time_str} {year}", "%b %d %H:%M:%S %Y")
+        day, clock = time_str.rsplit(" ", 1)
+        hour, minute, second = clock.split(":")
+        return self._parse_day(day).replace(hour=int(hour), minute=int(minute), second=int(second))
+
+    def _parse_day(self, day: str) -> datetime:
+        date: Optional[datetime] = self._dates.get(day)
+        if date is None:
+            date = self._dates[day] = datetime.strptime(f"{day} {datetime.now().year}", "%b %d %Y")
+        return date
+
+    def _parse_many(self, logs: Iterable[str], scan_ips: bool) -> List[SSHLogEntry]:
+        # parse_log for many lines: one pattern match per line instead of split and join;
+        # with scan_ips the same match also finds the first address
+        match: Callable[[str], Optional[re.Match[str]]] = (_LINE_IP_PATTERN if scan_ips else _LINE_PATTERN).match
+        intern: Callable[[str], str] = sys.intern
+        entries: List[SSHLogEntry] = []
+        last_time_str: str = ""
+        time: datetime = datetime.min
+        for log in logs:
+            matched: Optional[re.Match[str]] = match(log)
+            if matched is None:
+                entries.append(self.parse_log(log))
+                continue
+            time_str, month, day, hour, minute, second, host, pid, *ip, raw_content = matched.groups()
+            if time_str != last_time_str:
+                time = self._parse_day(f"{month} {day}").replace(hour=int(hour), minute=int(minute), second=int(second))
+                last_time_str = time_str
+            raw_content = raw_content.rstrip("\r\n")
+            # _entry_class inlined, this loop runs once per line
+            content: str = raw_content.lower()
+            if "failed password" in content:
+                entry_class: Type[SSHLogEntry] = PasswordRejected
+            elif "accepted password" in content:
+                entry_class = PasswordAccepted
+            elif "error" in content:
+                entry_class = Error
+            else:
+                entry_class = OtherInfo
+            entry: SSHLogEntry = entry_class(time, raw_content, int(pid), intern(host))
+            if ip:
+                a, b, c, d, candidate = ip
+                if a is not None:
+                    entry._ip = int(a) << 24 | int(b) << 16 | int(c) << 8 | int(d)
+                else:
+                    # no candidate at all, or an invalid first one with maybe a valid one later
+                    entry._ip = None if candidate is None else first_ipv4(raw_content)
+            entries.append(entry)
+        return entries
 
     def append(self, log: str) -> None:
         entry: SSHLogEntry = self.parse_log(log)
         if entry.validate():
-            self._log_entries.append(entry)
+            if self._dedup:
+                members: Set[SSHLogEntry] = self._members()
+                if entry in members:
+                    return
+                members.add(entry)
+            elif self._entry_set is not None:
+                self._entry_set.add(entry)
+            if self._times and entry.time < self._times[-1]:
+                self._pending.append(entry)
+            else:
+                self._index_entry(len(self._log_entries), entry)
+                self._log_entries.append(entry)
+                self._times.append(entry.time)
         else:
             print("Invalid log entry:", log)
 
+    def extend(self, logs: Iterable[str]) -> None:
+        """Append many lines; indexes are updated in one sweep at the end.
+
+        parse_log already picks the class whose validate() holds, so entries
+        are not validated again.
+        """
+        self._extend(logs, self._ip_index is not None)
+
+    def _extend(self, logs: Iterable[str], scan_ips: bool) -> None:
+        # the cyclic gc keeps rescanning the new entries while they are created, none of them can form a cycle
+        gc_enabled: bool = gc.isenabled()
+        gc.disable()
+        try:
+            entries: List[SSHLogEntry] = self._parse_many(logs, scan_ips)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self._add_entries(entries)
+
+    def _add_entries(self, entries: List[SSHLogEntry]) -> None:
+        if self._dedup:
+            seen: Set[SSHLogEntry] = self._members()
+            fresh: List[SSHLogEntry] = []
+            for entry in entries:
+                if entry not in seen:
+                    seen.add(entry)
+                    fresh.append(entry)
+            entries = fresh
+        elif self._entry_set is not None:
+            self._entry_set.update(entries)
+
+        start: int = len(self._log_entries)
+        times: List[datetime] = [entry.time for entry in entries]
+        last: datetime = self._times[-1] if self._times else datetime.min
+        if times and times[0] >= last and all(map(le, times, times[1:])):
+            self._log_entries.extend(entries)
+            self._times.extend(times)
+        else:
+            # same routing as append: anything older than the newest entry waits for _merge
+            for entry, time in zip(entries, times):
+                if time < last:
+                    self._pending.append(entry)
+                else:
+                    self._log_entries.append(entry)
+                    self._times.append(time)
+                    last = time
+        self._index_from(start)
+
+    def load_file(self, path: str) -> None:
+        with open(path, "r") as file:
+            self.extend(file)
+
+    def load_file_parallel(self, path: str, processes: Optional[int] = None) -> None:
+        """load_file with the lines parsed by a pool of worker processes."""
+        processes = processes or os.cpu_count() or 1
+        # a few chunks per process, so a slow chunk does not hold up the rest
+        spans: List[Tuple[int, int]] = split_file(path, processes * 4)
+        scan_ips: bool = self._ip_index is not None
+        with Pool(processes) as pool:
+            partials: List[SSHLogJournal] = pool.starmap(load_chunk, [(path, start, end, scan_ips) for start, end in spans])
+        self.merge(partials)
+
+    def save(self, path: str, append: bool = False) -> None:
+        """Write the entries to a binary snapshot, see SSHLogSnapshot.
+
+        With append=True they are added as a new block at the end of an existing
+        snapshot, e.g. one more day of logs, instead of rewriting the file.
+        """
+        self._merge()
+        columns: JournalColumns = JournalColumns.from_entries(self._log_entries)
+        if append and os.path.exists(path):
+            with open(path, "r+b") as file:
+                end: int = _snapshot_end(file)
+                # drop what an unfinished append left behind
+                file.truncate(end)
+                file.seek(end)
+                _write_block(file, columns)
+        else:
+            tmp_path: str = path + ".tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+                _write_block(file, columns)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **options: bool) -> 'SSHLogJournal':
+        """Journal with the entries of a snapshot written by save."""
+        journal: SSHLogJournal = cls(**options)
+        with SSHLogSnapshot(path) as snapshot:
+            for block in snapshot._blocks:
+                journal._add_entries(block.entries())
+        return journal
+
+    def merge(self, journals: Iterable['SSHLogJournal']) -> None:
+        """Add the entries of other journals in time order.
+
+        Entries with the same time keep their order inside a journal, then the order of the journals.
+        """
+        parts: List[SSHLogJournal] = list(journals)
+        for journal in parts:
+            journal._merge()
+        self._add_entries(list(heapq.merge(*(journal._log_entries for journal in parts), key=_entry_time)))
+
+    def _merge(self) -> None:
+        # out-of-order entries are sorted and merged in one go; only positions from
+        # the first displaced entry on change, so only that tail is indexed again
+        if not self._pending:
+            return
+        self._pending.sort(key=_entry_time)
+        first: int = bisect_left(self._times, self._pending[0].time)
+        self._unindex_from(first)
+        tail: List[SSHLogEntry] = list(heapq.merge(self._log_entries[first:], self._pending, key=_entry_time))
+        # a new list, views handed out earlier keep the entries they were made from
+        self._log_entries = self._log_entries[:first] + tail
+        del self._times[first:]
+        self._times.extend(entry.time for entry in tail)
+        self._pending = []
+        self._index_from(first)
+
+    def _unindex_from(self, start: int) -> None:
+        # cut the postings of entries from position start on; postings are in position order
+        tail: List[SSHLogEntry] = self._log_entries[start:]
+        if self._ip_index is not None:
+            for ip in {entry.ip_int for entry in tail}:
+                if ip is None:
+                    continue
+                positions: List[int] = self._ip_index[ip]
+                del positions[bisect_left(positions, start):]
+                if not positions:
+                    del self._ip_index[ip]
+                    del self._ip_keys[bisect_left(self._ip_keys, ip)]
+        if self._token_index is not None and self._trigram_index is not None:
+            _cut_postings(self._token_index, set().union(*(tokenize(entry._raw_content) for entry in tail)), start)
+            _cut_postings(self._trigram_index, set().union(*(trigrams(entry._raw_content) for entry in tail)), start)
+
+    def _index_from(self, start: int) -> None:
+        # index entries from position start on, one pass per index
+        entries: List[SSHLogEntry] = self._log_entries
+        if self._ip_index is not None:
+            ip_index: Dict[int, List[int]] = self._ip_index
+            new_ips: List[int] = []
+            for position in range(start, len(entries)):
+                ip: Optional[int] = entries[position].ip_int
+                if ip is not None:
+                    positions: Optional[List[int]] = ip_index.get(ip)
+                    if positions is None:
+                        ip_index[ip] = [position]
+                        new_ips.append(ip)
+                    else:
+                        positions.append(position)
+            if new_ips:
+                self._ip_keys = list(heapq.merge(self._ip_keys, sorted(new_ips)))
+        if self._token_index is not None and self._trigram_index is not None:
+            for position in range(start, len(entries)):
+                content: str = entries[position]._raw_content
+                _add_posting(self._token_index, tokenize(content), position)
+                _add_posting(self._trigram_index, trigrams(content), position)
+
+    def _index_entry(self, position: int, entry: SSHLogEntry) -> None:
+        if self._token_index is not None and self._trigram_index is not None:
+            _add_posting(self._token_index, tokenize(entry._raw_content), position)
+            _add_posting(self._trigram_index, trigrams(entry._raw_content), position)
+        if self._ip_index is not None:
+            ip: Optional[int] = entry.ip_int
+            if ip is not None:
+                positions: Optional[List[int]] = self._ip_index.get(ip)
+                if positions is None:
+                    self._ip_index[ip] = [position]
+                    insort(self._ip_keys, ip)
+                else:
+                    positions.append(position)
+
+    def _get_by_ip(self, ip: int) -> List[SSHLogEntry]:
+        if self._ip_index is None:
+            return [entry for entry in self._log_entries if entry.ip_int == ip]
+        return [self._log_entries[position] for position in self._ip_index.get(ip, ())]
+
+    def _get_by_network(self, network: IPv4Network) -> List[SSHLogEntry]:
+        first: int = int(network.network_address)
+        last: int = int(network.broadcast_address)
+        if self._ip_index is None:
+            return [entry for entry in self._log_entries
+                    if entry.ip_int is not None and first <= entry.ip_int <= last]
+        keys: List[int] = self._ip_keys[bisect_left(self._ip_keys, first):bisect_right(self._ip_keys, last)]
+        # each list is already sorted, merge keeps the journal order
+        positions: Iterator[int] = heapq.merge(*(self._ip_index[ip] for ip in keys))
+        return [self._log_entries[position] for position in positions]
+
+    def _time_range(self, start: Optional[datetime], stop: Optional[datetime]) -> range:
+        first: int = 0 if start is None else bisect_left(self._times, start)
+        last: int = len(self._times) if stop is None else bisect_left(self._times, stop)
+        return range(first, max(first, last))
+
+    def between(self, start: Optional[datetime], stop: Optional[datetime]) -> SSHLogView:
+        """Entries with start <= time < stop; None leaves that end open."""
+        self._merge()
+        return SSHLogView(self._log_entries, self._time_range(start, stop))
+
+    def _get_by_time_prefix(self, search: str) -> List[SSHLogEntry]:
+        # "Dec 10 09" is a one hour range when every entry is from the same year
+        if self._times and self._times[0].year == self._times[-1].year:
+            for time_format, length in _TIME_PREFIXES:
+                try:
+                    start: datetime = datetime.strptime(search, time_format)
+                except ValueError:
+                    continue
+                if start.strftime(time_format) != search:
+                    continue
+                start = start.replace(year=self._times[0].year)
+                positions: range = self._time_range(start, start + length)
+                return self._log_entries[positions.start:positions.stop]
+        return [entry for entry in self._log_entries if search in entry.time.strftime("%b %d %H:%M:%S")]
+
     def get_logs_by_string(self, criteria: str) -> List[SSHLogEntry]:
-        return [entry for entry in self._log_entries if criteria in entry._raw_content]
+        self._merge()
+        if self._trigram_index is None or len(criteria) < _NGRAM:
+            return [entry for entry in self._log_entries if criteria in entry._raw_content]
+        # only entries holding the rarest trigram of the criteria can match
+        rarest: Optional['array[int]'] = None
+        for trigram in trigrams(criteria):
+            positions: Optional['array[int]'] = self._trigram_index.get(trigram)
+            if positions is None:
+                return []
+            if rarest is None or len(positions) < len(rarest):
+                rarest = positions
+        assert rarest is not None
+        return [entry for entry in map(self._log_entries.__getitem__, rarest) if criteria in entry._raw_content]
+
+    def get_logs_by_terms(self, terms: Iterable[str], match_all: bool = True) -> List[SSHLogEntry]:
+        """Entries containing all (or with match_all=False any) of the terms as whole tokens."""
+        self._merge()
+        wanted: List[str] = [term.lower() for term in terms]
+        if not wanted:
+            return []
+        if self._token_index is None:
+            check = all if match_all else any
+            found: List[SSHLogEntry] = []
+            for entry in self._log_entries:
+                tokens: Set[str] = tokenize(entry._raw_content)
+                if check(term in tokens for term in wanted):
+                    found.append(entry)
+            return found
+        postings: List['array[int]'] = sorted((self._token_index.get(term, array("I")) for term in wanted), key=len)
+        if match_all:
+            matched: Set[int] = set(postings[0])
+            for positions in postings[1:]:
+                matched.intersection_update(positions)
+        else:
+            matched = set().union(*postings)
+        return [self._log_entries[position] for position in sorted(matched)]
 
     def print(self) -> None:
         for entry in self:
@@ -132,31 +789,232 @@ class SSHLogJournal:
         entry: SSHLogEntry = self.parse_log(log)
         return entry in self
 
-    def search_entry(self, time: datetime, raw_content: str, pid: str, host: str) -> bool:
-        if "failed password" in raw_content.lower():
-            entry: SSHLogEntry = PasswordRejected(time, raw_content, pid, host)
-        elif "accepted password" in raw_content.lower():
-            entry = PasswordAccepted(time, raw_content, pid, host)
-        elif "error" in raw_content.lower():
-            entry = Error(time, raw_content, pid, host)
-        else:
-            entry = OtherInfo(time, raw_content, pid, host)
+    def search_entry(self, time: datetime, raw_content: str, pid: Union[int, str], host: str) -> bool:
+        entry: SSHLogEntry = _entry_class(raw_content)(time, raw_content, int(pid), host)
         return entry in self
 
     @overload
-    def __getitem__(self, search: Union[slice, IPv4Address, str]) -> List[SSHLogEntry]: ...
+    def __getitem__(self, search: Union[slice, IPv4Address, IPv4Network, str]) -> Sequence[SSHLogEntry]: ...
     @overload
     def __getitem__(self, search: int) -> SSHLogEntry: ...
     
-    def __getitem__(self, search: Union[slice, int, IPv4Address, str]) -> Union[SSHLogEntry, List[SSHLogEntry]]:
+    def __getitem__(self, search: Union[slice, int, IPv4Address, IPv4Network, str]) -> Union[SSHLogEntry, Sequence[SSHLogEntry]]:
+        self._merge()
         if isinstance(search, slice):
+            if isinstance(search.start, datetime) or isinstance(search.stop, datetime):
+                if search.step is not None:
+                    raise ValueError("Time slices do not support a step")
+                return self.between(search.start, search.stop)
             return self._log_entries[search.start:search.stop:search.step]
         elif isinstance(search, int):
             return self._log_entries[search]
         elif isinstance(search, IPv4Address):
-            return [entry for entry in self._log_entries if entry.has_ip and entry._extract_ip() == search]
+            return self._get_by_ip(int(search))
+        elif isinstance(search, IPv4Network):
+            return self._get_by_network(search)
         elif isinstance(search, str):
-            return [entry for entry in self._log_entries if search in entry.time.strftime("%b %d %H:%M:%S")]
+            return self._get_by_time_prefix(search)
+        else:
+            raise ValueError("Invalid argument type")
+
+def split_file(path: str, chunks: int) -> List[Tuple[int, int]]:
+    # byte ranges [start, end) that always end right after a newline;
+    # a copy of split_file from 2/parallel.py, every lab runs on its own
+    size: int = os.path.getsize(path)
+    step: int = max(1, size // max(1, chunks))
+    spans: List[Tuple[int, int]] = []
+
+    with open(path, "rb") as file:
+        start: int = 0
+        while start < size:
+            file.seek(min(start + step, size))
+            file.readline()
+            end: int = min(file.tell(), size)
+            spans.append((start, end))
+            start = end
+
+    return spans
+
+def load_chunk(path: str, start: int, end: int, scan_ips: bool = True) -> SSHLogJournal:
+    """Partial journal of the lines in bytes [start, end) of the file, built in a worker process."""
+    with open(path, "rb") as file:
+        file.seek(start)
+        data: bytes = file.read(end - start)
+    journal: SSHLogJournal = SSHLogJournal(index_ips=False)
+    # decoded and split into lines the same way as open(path, "r"); the address scan
+    # is the costly part of the ip index, so it is done here in parallel
+    journal._extend(io.TextIOWrapper(io.BytesIO(data)), scan_ips)
+    journal._merge()
+    return journal
+
+class LazySSHLogJournal(Sequence[SSHLogEntry]):
+    """Journal over a log file: loading only finds line offsets, entries are parsed on access.
+
+    Entries stay in file order. Parsed entries live in a bounded LRU cache, so memory
+    grows with the offsets (8 B per line) and with what is actually touched.
+    """
+
+    BLOCK_SIZE: ClassVar[int] = 16 * 1024 * 1024
+
+    def __init__(self, path: str, cache_size: int = 4096) -> None:
+        self._file = open(path, "rb")
+        size: int = os.fstat(self._file.fileno()).st_size
+        self._map: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        # start of every line, followed by the end of the last one
+        self._offsets: 'array[int]' = self._scan_lines(size)
+        self._parser: SSHLogJournal = SSHLogJournal(index_ips=False)
+        self._entry_at: Callable[[int], SSHLogEntry] = lru_cache(maxsize=cache_size)(self._parse_at)
+
+    def _scan_lines(self, size: int) -> 'array[int]':
+        offsets: 'array[int]' = array("Q", (0,))
+        if self._map is None:
+            return offsets
+        start: int = 0
+        while start < size:
+            # whole blocks cut at their last newline; split and accumulate run in C
+            end: int = min(start + self.BLOCK_SIZE, size)
+            if end < size:
+                newline: int = self._map.rfind(b"\n", start, end)
+                if newline == -1:
+                    newline = self._map.find(b"\n", end)
+                end = size if newline == -1 else newline + 1
+            lines: List[bytes] = self._map[start:end].split(b"\n")
+            if not lines[-1]:
+                lines.pop()
+            ends: Iterator[int] = accumulate(map(add, map(len, lines), repeat(1)), initial=start)
+            next(ends)
+            offsets.extend(ends)
+            # the last line of the file may have no newline
+            offsets[-1] = end
+            start = end
+        return offsets
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'LazySSHLogJournal':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _line(self, position: int) -> str:
+        assert self._map is not None
+        return self._map[self._offsets[position]:self._offsets[position + 1]].decode("utf-8", errors="replace")
+
+    def _parse_at(self, position: int) -> SSHLogEntry:
+        return self._parser.parse_log(self._line(position))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[SSHLogEntry]:
+        return map(self._entry_at, range(len(self)))
+
+    @overload
+    def __getitem__(self, index: int) -> SSHLogEntry: ...
+    @overload
+    def __getitem__(self, index: slice) -> SSHLogView: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SSHLogEntry, SSHLogView]:
+        positions: range = range(len(self))
+        if isinstance(index, slice):
+            return SSHLogView(self, positions[index])
+        elif isinstance(index, int):
+            return self._entry_at(positions[index])
+        else:
+            raise ValueError("Invalid argument type")
+
+    def _positions_containing(self, text: str) -> Iterator[int]:
+        # search the mapped file itself and only parse lines with a hit
+        if self._map is None or not text:
+            return
+        needle: bytes = text.encode()
+        found: int = self._map.find(needle)
+        while found != -1:
+            position: int = bisect_right(self._offsets, found) - 1
+            yield position
+            found = self._map.find(needle, self._offsets[position + 1])
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, SSHLogEntry):
+            return False
+        return any(self._entry_at(position) == item for position in self._positions_containing(item._raw_content))
+
+    def get_logs_by_string(self, criteria: str) -> List[SSHLogEntry]:
+        if not criteria:
+            return list(self)
+        entries: Iterator[SSHLogEntry] = map(self._entry_at, self._positions_containing(criteria))
+        return [entry for entry in entries if criteria in entry._raw_content]
+
+    def search_entry_log(self, log: str) -> bool:
+        return self._parser.parse_log(log) in self
+
+    def print(self) -> None:
+        for entry in self:
+            print(entry)
+
+class SSHLogSnapshot(Sequence[SSHLogEntry]):
+    """Read-only journal over a snapshot written by SSHLogJournal.save.
+
+    Opening maps the file and only reads the block headers; entries are built
+    from the mapped columns when they are accessed, nothing is parsed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size < _SNAPSHOT_HEADER.size:
+                raise ValueError("Not an SSH journal snapshot")
+            self._map: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer: memoryview = memoryview(self._map)
+            self._blocks: List[JournalColumns] = [_read_block(self._buffer, start)
+                                                  for start, _ in _snapshot_blocks(self._buffer)]
+        except ValueError:
+            self._file.close()
+            raise
+        # position of the first entry of every block, and the total at the end
+        self._starts: List[int] = list(accumulate(map(len, self._blocks), initial=0))
+
+    def close(self) -> None:
+        self._blocks = []
+        self._starts = [0]
+        self._buffer.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # a column is still referenced somewhere, the map goes away together with it
+            pass
+        self._file.close()
+
+    def __enter__(self) -> 'SSHLogSnapshot':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def __iter__(self) -> Iterator[SSHLogEntry]:
+        for block in self._blocks:
+            yield from block.entries()
+
+    @overload
+    def __getitem__(self, index: int) -> SSHLogEntry: ...
+    @overload
+    def __getitem__(self, index: slice) -> SSHLogView: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SSHLogEntry, SSHLogView]:
+        positions: range = range(len(self))
+        if isinstance(index, slice):
+            return SSHLogView(self, positions[index])
+        elif isinstance(index, int):
+            position: int = positions[index]
+            block: int = bisect_right(self._starts, position) - 1
+            return self._blocks[block].entry(position - self._starts[block])
         else:
             raise ValueError("Invalid argument type")
 
@@ -175,10 +1033,7 @@ def main() -> None:
     # init
     journal: SSHLogJournal = SSHLogJournal()
     file_path: str = "SSH.log"
-    with open(file_path, 'r') as file:
-        log_lines: List[str] = file.readlines()
-    for line in log_lines:
-        journal.append(line)
+    journal.load_file(file_path)
 
     # tests
     print("Długość dziennika:", len(journal))
@@ -1,7 +1,8 @@
 import ipaddress
+import pickle
 import pytest
 
-from l6 import Error, OtherInfo, PasswordAccepted, PasswordRejected, SSHLogJournal
+from l6 import Error, LazySSHLogJournal, OtherInfo, PasswordAccepted, PasswordRejected, SSHLogJournal, SSHLogSnapshot
 
 
 def test_parse_time():
@@ -49,3 +50,261 @@ def test_append(log_line, expected):
     journal.append(log_line)
     
     assert isinstance(journal[-1], expected)
+
+
+def test_ip_int():
+    journal = SSHLogJournal()
+    entry = journal.parse_log("Dec 10 06:55:48 LabSZ sshd[24200]: Failed password for invalid user webmaster from 173.234.31.186 port 38926 ssh2")
+
+    assert entry.ip_int == int(ipaddress.IPv4Address("173.234.31.186"))
+
+
+def test_getitem_ip():
+    journal = SSHLogJournal()
+    journal.append("Dec 10 06:55:48 LabSZ sshd[24200]: Failed password for invalid user webmaster from 173.234.31.186 port 38926 ssh2")
+    journal.append("Dec 10 07:07:45 LabSZ sshd[24206]: Failed password for invalid user test9 from 52.80.34.196 port 36060 ssh2")
+    journal.append("Dec 10 10:54:29 LabSZ sshd[24870]: input_userauth_request: invalid user dff [preauth]")
+
+    found = journal[ipaddress.IPv4Address("52.80.34.196")]
+    assert len(found) == 1
+    assert found[0] is journal[1]
+
+
+@pytest.mark.parametrize("index_ips", [True, False])
+def test_getitem_network(index_ips):
+    journal = SSHLogJournal(index_ips=index_ips)
+    journal.append("Dec 10 06:55:48 LabSZ sshd[24200]: Failed password for invalid user webmaster from 183.62.140.253 port 38926 ssh2")
+    journal.append("Dec 10 07:07:45 LabSZ sshd[24206]: Failed password for invalid user test9 from 52.80.34.196 port 36060 ssh2")
+    journal.append("Dec 10 07:08:28 LabSZ sshd[24208]: Failed password for root from 183.62.1.9 port 52344 ssh2")
+    journal.append("Dec 10 07:11:42 LabSZ sshd[24224]: Failed password for root from 183.62.140.253 port 48502 ssh2")
+    journal.append("Dec 10 10:54:29 LabSZ sshd[24870]: input_userauth_request: invalid user dff [preauth]")
+
+    found = journal[ipaddress.IPv4Network("183.62.0.0/16")]
+    assert found == [journal[0], journal[2], journal[3]]
+    assert journal[ipaddress.IPv4Network("10.0.0.0/8")] == []
+    assert journal[ipaddress.IPv4Address("183.62.140.253")] == [journal[0], journal[3]]
+
+
+TIMED_LINES = [
+    "Dec 10 06:55:48 LabSZ sshd[24200]: Failed password for invalid user webmaster from 173.234.31.186 port 38926 ssh2",
+    "Dec 10 07:07:45 LabSZ sshd[24206]: Failed password for invalid user test9 from 52.80.34.196 port 36060 ssh2",
+    "Dec 10 09:12:48 LabSZ sshd[24503]: Received disconnect from 187.141.143.180: 11: Bye Bye [preauth]",
+    "Dec 10 09:32:20 LabSZ sshd[24680]: Accepted password for fztu from 119.137.62.142 port 49116 ssh2",
+    "Dec 10 10:54:29 LabSZ sshd[24870]: input_userauth_request: invalid user dff [preauth]",
+]
+
+
+def test_between():
+    journal = SSHLogJournal()
+    for line in TIMED_LINES:
+        journal.append(line)
+
+    start = journal[2].time.replace(minute=0, second=0)
+    view = journal.between(start, start.replace(hour=10))
+    assert list(view) == [journal[2], journal[3]]
+    assert list(journal[start:]) == [journal[2], journal[3], journal[4]]
+    assert list(journal[:start]) == [journal[0], journal[1]]
+    assert journal["Dec 10 09"] == [journal[2], journal[3]]
+    assert journal["09:12"] == [journal[2]]
+
+
+def test_out_of_order_append():
+    journal = SSHLogJournal()
+    for line in reversed(TIMED_LINES):
+        journal.append(line)
+
+    assert len(journal) == len(TIMED_LINES)
+    assert [entry.time for entry in journal] == sorted(entry.time for entry in journal)
+    assert journal[ipaddress.IPv4Address("52.80.34.196")] == [journal[1]]
+
+
+def test_search_entry_log():
+    journal = SSHLogJournal()
+    for line in TIMED_LINES:
+        journal.append(line)
+
+    assert journal.search_entry_log(TIMED_LINES[2])
+    assert journal[2] in journal
+    assert not journal.search_entry_log("Dec 10 09:12:49 LabSZ sshd[24503]: Received disconnect from 187.141.143.180: 11: Bye Bye [preauth]")
+
+
+@pytest.mark.parametrize("dedup, expected", [(False, 2 * len(TIMED_LINES)), (True, len(TIMED_LINES))])
+def test_dedup(dedup, expected):
+    journal = SSHLogJournal(dedup=dedup)
+    for line in TIMED_LINES + TIMED_LINES:
+        journal.append(line)
+
+    assert len(journal) == expected
+
+
+@pytest.mark.parametrize("index_text", [True, False])
+def test_text_queries(index_text):
+    journal = SSHLogJournal(index_text=index_text)
+    for line in TIMED_LINES:
+        journal.append(line)
+
+    assert journal.get_logs_by_string("password for") == [journal[0], journal[1], journal[3]]
+    assert journal.get_logs_by_string("Bye Bye") == [journal[2]]
+    assert journal.get_logs_by_string("ye") == [journal[2]]
+    assert journal.get_logs_by_string("no such text") == []
+    assert journal.get_logs_by_terms(["invalid", "user"]) == [journal[0], journal[1], journal[4]]
+    assert journal.get_logs_by_terms(["FZTU", "187.141.143.180"], match_all=False) == [journal[2], journal[3]]
+    assert journal.get_logs_by_terms(["invalid", "fztu"]) == []
+
+
+def test_compact_entry():
+    journal = SSHLogJournal()
+    journal.append(TIMED_LINES[0])
+    journal.append(TIMED_LINES[1])
+
+    assert journal[0].pid == 24200
+    assert journal[0].host is journal[1].host
+    assert not hasattr(journal[0], "__dict__")
+    assert journal.search_entry(journal[0].time, journal[0]._raw_content, "24200", "LabSZ")
+
+
+def test_lazy_journal(tmp_path):
+    path = tmp_path / "SSH.log"
+    path.write_text("\n".join(TIMED_LINES))
+    journal = SSHLogJournal()
+    for line in TIMED_LINES:
+        journal.append(line)
+
+    with LazySSHLogJournal(str(path), cache_size=2) as lazy:
+        assert len(lazy) == len(journal)
+        assert lazy[-1] == journal[-1]
+        assert list(lazy[1:3]) == [journal[1], journal[2]]
+        assert list(lazy) == list(journal)
+        assert lazy.get_logs_by_string("password for") == journal.get_logs_by_string("password for")
+        assert journal[3] in lazy
+        assert isinstance(lazy[0], PasswordRejected)
+
+
+@pytest.mark.parametrize("lines", [TIMED_LINES, TIMED_LINES[::-1], TIMED_LINES[2:] + TIMED_LINES[:3]])
+def test_extend(lines):
+    appended = SSHLogJournal(index_text=True)
+    for line in lines:
+        appended.append(line)
+    extended = SSHLogJournal(index_text=True)
+    extended.extend(lines)
+
+    assert list(extended) == list(appended)
+    assert [type(entry) for entry in extended] == [type(entry) for entry in appended]
+    assert [entry.pid for entry in extended] == [entry.pid for entry in appended]
+    assert extended[ipaddress.IPv4Network("52.80.0.0/16")] == appended[ipaddress.IPv4Network("52.80.0.0/16")]
+    assert extended.get_logs_by_terms(["invalid"]) == appended.get_logs_by_terms(["invalid"])
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("Failed password for root from 5.6.7.8 port 22 ssh2", "5.6.7.8"),
+        ("from 01.2.3.4 and 5.6.7.8", "5.6.7.8"),
+        ("1.2.3.256 then 300.1.1.1 then 0.0.0.0", "0.0.0.0"),
+        ("1.2.3.4567 and a1.2.3.4 and 7.1.2.3.4", "7.1.2.3"),
+        ("port 22 from x12 255.255.255.255", "255.255.255.255"),
+        ("input_userauth_request: invalid user dff [preauth]", None),
+    ],
+)
+def test_extend_ip(content, expected):
+    journal = SSHLogJournal()
+    journal.extend([f"Dec 10 06:55:48 LabSZ sshd[24200]: {content}\n"])
+    entry = journal[0]
+
+    assert entry.ip_int == (int(ipaddress.IPv4Address(expected)) if expected else None)
+    assert entry.ip_int == journal.parse_log(f"Dec 10 06:55:48 LabSZ sshd[24200]: {content}").ip_int
+
+
+def test_load_file(tmp_path):
+    path = tmp_path / "SSH.log"
+    path.write_text("\n".join(TIMED_LINES + TIMED_LINES) + "\n")
+
+    journal = SSHLogJournal(dedup=True)
+    journal.load_file(str(path))
+    assert len(journal) == len(TIMED_LINES)
+    assert journal.search_entry_log(TIMED_LINES[0])
+
+
+def test_load_file_parallel(tmp_path):
+    path = tmp_path / "SSH.log"
+    path.write_text("\n".join(TIMED_LINES * 20) + "\n")
+    journal = SSHLogJournal()
+    journal.load_file(str(path))
+
+    parallel = SSHLogJournal()
+    parallel.load_file_parallel(str(path), processes=2)
+    assert list(parallel) == list(journal)
+    assert [entry.host for entry in parallel] == [entry.host for entry in journal]
+    assert parallel[ipaddress.IPv4Address("52.80.34.196")] == journal[ipaddress.IPv4Address("52.80.34.196")]
+
+
+def test_pickle_journal():
+    journal = SSHLogJournal()
+    for line in TIMED_LINES[::-1]:
+        journal.append(line)
+
+    restored = pickle.loads(pickle.dumps(journal))
+    assert list(restored) == list(journal)
+    assert [type(entry) for entry in restored] == [type(entry) for entry in journal]
+    assert [entry.pid for entry in restored] == [entry.pid for entry in journal]
+    assert restored[ipaddress.IPv4Address("52.80.34.196")] == [restored[1]]
+
+
+def test_snapshot(tmp_path):
+    path = str(tmp_path / "journal.snap")
+    journal = SSHLogJournal()
+    journal.extend(TIMED_LINES[:3])
+    journal.save(path)
+    later = SSHLogJournal()
+    later.extend(TIMED_LINES[3:])
+    later.save(path, append=True)
+
+    loaded = SSHLogJournal.load(path)
+    assert [entry.time for entry in loaded] == [entry.time for entry in list(journal) + list(later)]
+    assert [(type(entry), entry.pid, entry.host, entry._raw_content) for entry in loaded] == \
+        [(type(entry), entry.pid, entry.host, entry._raw_content) for entry in list(journal) + list(later)]
+    assert loaded[ipaddress.IPv4Address("119.137.62.142")] == [loaded[3]]
+
+    with SSHLogSnapshot(path) as snapshot:
+        assert len(snapshot) == len(TIMED_LINES)
+        assert snapshot[-1] == loaded[-1]
+        assert list(snapshot[1:4]) == loaded[1:4]
+
+
+def test_snapshot_partial_append(tmp_path):
+    path = tmp_path / "journal.snap"
+    journal = SSHLogJournal()
+    journal.extend(TIMED_LINES)
+    journal.save(str(path))
+    complete = path.read_bytes()
+    journal.save(str(path), append=True)
+    path.write_bytes(path.read_bytes()[:-10])
+
+    assert len(SSHLogJournal.load(str(path))) == len(TIMED_LINES)
+    journal.save(str(path), append=True)
+    assert path.read_bytes()[:len(complete)] == complete
+    assert len(SSHLogJournal.load(str(path))) == 2 * len(TIMED_LINES)
+
+
+def test_snapshot_header(tmp_path):
+    path = tmp_path / "SSH.log"
+    path.write_text("\n".join(TIMED_LINES))
+
+    with pytest.raises(ValueError):
+        SSHLogJournal.load(str(path))
+
+
+def test_out_of_order_indexes():
+    lines = TIMED_LINES[:2] + TIMED_LINES[3:] + TIMED_LINES[2:3]
+    journal = SSHLogJournal(index_text=True)
+    for line in lines:
+        journal.append(line)
+    journal.get_logs_by_string("Bye")
+
+    rebuilt = SSHLogJournal(index_text=True)
+    rebuilt.extend(TIMED_LINES)
+    assert list(journal) == list(rebuilt)
+    assert journal._ip_index == rebuilt._ip_index
+    assert journal._ip_keys == rebuilt._ip_keys
+    assert journal._token_index == rebuilt._token_index
+    assert journal._trigram_index == rebuilt._trigram_index
@@ -0,0 +1,30 @@
+# Szybkie wyszukiwanie adresow IPv4 w tekscie.
+# Adresy sa zwracane jako liczby 32-bitowe, wiec porownanie dwoch adresow
+# to porownanie dwoch intow, bez tworzenia obiektow IPv4Address.
+
+import re
+import socket
+
+# same rules as IPv4Address: 0-255 and no leading zeros
+_OCTET = r"(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+# every dotted quad in the text: as four octets when it is a valid address, as a whole
+# (the fifth group) when it is not, so an invalid quad is skipped instead of its tail matching;
+# the lookahead skips the positions that cannot start one
+IPV4_CANDIDATE = re.compile(rf"\b(?=\d{{1,3}}\.)(?:{_OCTET}\.{_OCTET}\.{_OCTET}\.{_OCTET}\b|(\d{{1,3}}\.\d{{1,3}}\.\d{{1,3}}\.\d{{1,3}})\b)")
+
+
+def find_ipv4s(text: str) -> list[int]:
+    return [int(a) << 24 | int(b) << 16 | int(c) << 8 | int(d)
+            for a, b, c, d, _ in (match.groups() for match in IPV4_CANDIDATE.finditer(text)) if a is not None]
+
+
+def first_ipv4(text: str) -> int | None:
+    for match in IPV4_CANDIDATE.finditer(text):
+        a, b, c, d, _ = match.groups()
+        if a is not None:
+            return int(a) << 24 | int(b) << 16 | int(c) << 8 | int(d)
+    return None
+
+
+def ipv4_to_str(packed: int) -> str:
+    return socket.inet_ntoa(packed.to_bytes(4, "big"))
@@ -0,0 +1,39 @@
+# Szybkie parsowanie dat z logow.
+# Kolejne linie prawie zawsze maja ta sama date, wiec strptime jest wolane
+# tylko raz na dzien, a godzina jest doklejana przez datetime.replace().
+
+from datetime import datetime
+from typing import AnyStr
+
+MAX_CACHED_DATES = 4096
+
+_access_dates: dict = {}
+_access_days: dict = {}
+_syslog_dates: dict = {}
+
+
+def _date(cache: dict, prefix: AnyStr, format: str) -> datetime:
+    base = cache.get(prefix)
+    if base is None:
+        if len(cache) >= MAX_CACHED_DATES:
+            cache.clear()
+        text = prefix.decode() if isinstance(prefix, bytes) else prefix
+        base = cache[prefix] = datetime.strptime(text, format)
+    return base
+
+
+def parse_access_time(raw: AnyStr) -> datetime:
+    # "01/Jul/1995:00:00:01 -0400", same result as strptime(raw, "%d/%b/%Y:%H:%M:%S %z")
+    base = _date(_access_dates, raw[:11] + raw[20:], "%d/%b/%Y %z")
+    return base.replace(hour=int(raw[12:14]), minute=int(raw[15:17]), second=int(raw[18:20]))
+
+
+def parse_access_date(raw: AnyStr) -> datetime:
+    # "01/Jul/1995", same result as strptime(raw, "%d/%b/%Y")
+    return _date(_access_days, raw, "%d/%b/%Y")
+
+
+def parse_syslog_time(raw: AnyStr) -> datetime:
+    # "Dec 10 09:12:48", same result as strptime(raw, "%b %d %H:%M:%S")
+    base = _date(_syslog_dates, raw[:-9], "%b %d")
+    return base.replace(hour=int(raw[-8:-6]), minute=int(raw[-5:-3]), second=int(raw[-2:]))